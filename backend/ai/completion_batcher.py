@@ -0,0 +1,138 @@
+"""
+Request-coalescing dispatcher for chat completions.
+
+Concurrent chatbot requests are collected for a short window and issued as
+parallel async calls over one shared AsyncOpenAI client, so TCP/TLS state is
+reused instead of every request thread paying its own round trip setup.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import openai
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Coalescing window and batch size for queued completion requests
+BATCH_WINDOW_SECONDS = 0.02
+MAX_BATCH_SIZE = 16
+
+# HTTP timeout of the shared client, and how long a caller waits for its response
+# (request timeout plus headroom for queueing)
+REQUEST_TIMEOUT_SECONDS = 60
+RESULT_TIMEOUT_SECONDS = REQUEST_TIMEOUT_SECONDS + 30
+
+
+class CompletionBatcher:
+    """
+    Owns a background event loop that drains queued completion requests.
+
+    Callers stay synchronous: `create()` enqueues the request kwargs and
+    blocks on a future that resolves once its response returns.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        window: float = BATCH_WINDOW_SECONDS,
+        max_batch: int = MAX_BATCH_SIZE
+    ):
+        self.window = window
+        self.max_batch = max_batch
+        self._api_key = api_key
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="completion-batcher", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._queue: "asyncio.Queue[Tuple[Dict[str, Any], Future]]" = asyncio.Queue()
+        self._client = openai.AsyncOpenAI(
+            api_key=self._api_key,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                timeout=REQUEST_TIMEOUT_SECONDS
+            )
+        )
+        self._loop.create_task(self._worker())
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _worker(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # The worker must outlive any failure, or every later caller would wait forever
+            try:
+                await self._dispatch(batch)
+            except Exception as e:
+                logger.exception(f"Completion batch dispatch failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _dispatch(self, batch) -> None:
+        # Skip requests whose caller gave up while they were queued
+        batch = [(kwargs, future) for kwargs, future in batch if future.set_running_or_notify_cancel()]
+        logger.debug(f"Dispatching {len(batch)} coalesced completion request(s)")
+
+        # create() validates its arguments synchronously, so a bad request fails here,
+        # before gather; only its own caller gets the error
+        pending = []
+        for kwargs, future in batch:
+            try:
+                pending.append((self._client.chat.completions.create(**kwargs), future))
+            except Exception as e:
+                future.set_exception(e)
+
+        results = await asyncio.gather(*[coro for coro, _ in pending], return_exceptions=True)
+        for (_, future), result in zip(pending, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def create(self, **kwargs) -> Any:
+        """Queue a chat.completions.create call and wait for its response."""
+        future: Future = Future()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (kwargs, future))
+        try:
+            return future.result(timeout=RESULT_TIMEOUT_SECONDS)
+        except TimeoutError:
+            future.cancel()  # only succeeds while still queued; the worker then skips it
+            raise
+
+
+_batcher: Optional[CompletionBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_completion_batcher() -> CompletionBatcher:
+    """Return the process-wide completion batcher, starting it on first use."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                if not settings.OPENAI_API_KEY:
+                    raise ValueError("OPENAI_API_KEY is required. Please set it in .env file or environment variables.")
+                _batcher = CompletionBatcher(settings.OPENAI_API_KEY)
+    return _batcher
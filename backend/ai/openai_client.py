@@ -3,6 +3,8 @@ OpenAI client wrapper for GPT-5 Nano/Mini
 """
 
 import openai
+import httpx
+import threading
 from typing import Dict, Any, Optional, List
 from config.settings import settings
 import json
@@ -18,6 +20,26 @@ if settings.OPENAI_API_KEY:
 else:
     logger.warning("OPENAI_API_KEY not set. AI features will not work.")
 
+# One pooled OpenAI client per process so every OpenAIClient reuses TLS connections
+_shared_client: Optional[openai.OpenAI] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_openai_client() -> openai.OpenAI:
+    """Return the process-wide OpenAI client, creating it on first use."""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = openai.OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    http_client=httpx.Client(
+                        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+                    )
+                )
+    return _shared_client
+
+
 class OpenAIClient:
     def __init__(self):
         # Use exact model names from settings (gpt-5-nano and gpt-5-mini)
@@ -28,7 +50,7 @@ class OpenAIClient:
             logger.error("OPENAI_API_KEY is required. Please set it in .env file.")
             raise ValueError("OPENAI_API_KEY is required. Please set it in .env file or environment variables.")
         
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_shared_openai_client()
         logger.info(f"OpenAI Client initialized - Primary: {self.primary_model}, Fallback: {self.fallback_model}")
     
     def classify_blocks(
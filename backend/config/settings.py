@@ -25,6 +25,9 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "storage/uploads"
     REPORTS_DIR: str = "storage/reports"
     EVIDENCE_DIR: str = "storage/evidence"
+    # Parsed-document cache, keyed by PARSE_CACHE_VERSION + file path + mtime + size (0 bytes disables it)
+    PARSE_CACHE_DIR: str = "storage/parse_cache"
+    PARSE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
     # Maximum single file size (safety limit) - 50 MB
     MAX_FILE_SIZE: int = 50 * 1024 * 1024
     
@@ -33,6 +36,8 @@ class Settings(BaseSettings):
     EXTRACTION_RETRY_LIMIT: int = 3
     CHUNK_SIZE: int = 4000
     CHUNK_OVERLAP: int = 200
+    # Dump extracted PDF text/sections to storage/debug (written off the request path)
+    DOCLING_DEBUG_FILES: bool = True
     
     # API Security
     API_TOKEN: Optional[str] = None
@@ -4,10 +4,12 @@ Supports comprehensive Q&A about dashboard, KPIs, approval, comparison, trends
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, Optional, List
 from pydantic import BaseModel
 import logging
-from services.chatbot_service import ChatbotService
+from sqlalchemy.orm import load_only
+from services.chatbot_service import ChatbotService, CONTEXT_BLOCK_COLUMNS
 from config.database import get_db, Batch, Block, close_db
 
 router = APIRouter()
@@ -73,6 +75,63 @@ class ChatQueryResponse(BaseModel):
     requires_context: bool
 
 
+def _load_query_context(request: ChatQueryRequest, db):
+    """Validate a chat request and build its context. Returns (batch, context)."""
+    # Validate request
+    if not request.query or not request.query.strip():
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+    
+    if not request.batch_id:
+        raise HTTPException(status_code=400, detail="batch_id is required")
+    
+    # Get batch
+    batch = db.query(Batch).filter(Batch.id == request.batch_id).first()
+    if not batch:
+        raise HTTPException(status_code=404, detail=f"Batch {request.batch_id} not found")
+    
+    # Get all blocks (limit to prevent huge context), loading only the columns the context reads
+    blocks = (
+        db.query(Block)
+        .options(load_only(*[getattr(Block, column) for column in CONTEXT_BLOCK_COLUMNS]))
+        .filter(Block.batch_id == request.batch_id)
+        .limit(50)
+        .all()
+    )
+    
+    # Get page-specific context
+    comparison_data = None
+    unified_report_data = None
+    
+    if request.current_page == "compare" and request.comparison_batch_ids:
+        # Fetch comparison data
+        try:
+            comparison_data = get_comparison_data(request.comparison_batch_ids, db)
+        except Exception as e:
+            logger.warning(f"Could not fetch comparison data: {e}")
+    
+    elif request.current_page == "unified-report":
+        # Fetch unified report data
+        try:
+            unified_report_data = get_unified_report_data(request.batch_id, db)
+        except Exception as e:
+            logger.warning(f"Could not fetch unified report data: {e}")
+    
+    # Build context
+    try:
+        context = chatbot_service.build_context(
+            batch=batch,
+            blocks=blocks,
+            current_page=request.current_page or "dashboard",
+            comparison_data=comparison_data,
+            unified_report_data=unified_report_data
+        )
+    except Exception as e:
+        logger.error(f"Error building context: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error building context: {str(e)}")
+    
+    return batch, context
+
+
 @router.get("/health")
 def chatbot_health():
     """Check if chatbot service is properly configured."""
@@ -125,53 +184,8 @@ def query_chatbot(request: ChatQueryRequest) -> ChatQueryResponse:
     """
     db = None
     try:
-        # Validate request
-        if not request.query or not request.query.strip():
-            raise HTTPException(status_code=400, detail="Query cannot be empty")
-        
-        if not request.batch_id:
-            raise HTTPException(status_code=400, detail="batch_id is required")
-        
         db = get_db()
-        
-        # Get batch
-        batch = db.query(Batch).filter(Batch.id == request.batch_id).first()
-        if not batch:
-            raise HTTPException(status_code=404, detail=f"Batch {request.batch_id} not found")
-        
-        # Get all blocks (limit to prevent huge context)
-        blocks = db.query(Block).filter(Block.batch_id == request.batch_id).limit(50).all()
-        
-        # Get page-specific context
-        comparison_data = None
-        unified_report_data = None
-        
-        if request.current_page == "compare" and request.comparison_batch_ids:
-            # Fetch comparison data
-            try:
-                comparison_data = get_comparison_data(request.comparison_batch_ids, db)
-            except Exception as e:
-                logger.warning(f"Could not fetch comparison data: {e}")
-        
-        elif request.current_page == "unified-report":
-            # Fetch unified report data
-            try:
-                unified_report_data = get_unified_report_data(request.batch_id, db)
-            except Exception as e:
-                logger.warning(f"Could not fetch unified report data: {e}")
-        
-        # Build context
-        try:
-            context = chatbot_service.build_context(
-                batch=batch,
-                blocks=blocks,
-                current_page=request.current_page or "dashboard",
-                comparison_data=comparison_data,
-                unified_report_data=unified_report_data
-            )
-        except Exception as e:
-            logger.error(f"Error building context: {e}", exc_info=True)
-            raise HTTPException(status_code=500, detail=f"Error building context: {str(e)}")
+        batch, context = _load_query_context(request, db)
         
         # Generate response
         try:
@@ -202,6 +216,38 @@ def query_chatbot(request: ChatQueryRequest) -> ChatQueryResponse:
             close_db(db)
 
 
+@router.post("/query/stream")
+def query_chatbot_stream(request: ChatQueryRequest) -> StreamingResponse:
+    """
+    Stream the chatbot answer as server-sent events.
+    
+    Emits "delta" events with answer text as it is generated and a final
+    "done" event with the same payload shape as /query.
+    """
+    db = None
+    try:
+        db = get_db()
+        batch, context = _load_query_context(request, db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in query_chatbot_stream: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)[:200]}")
+    finally:
+        # Context is fully materialized; release the session before streaming
+        if db:
+            close_db(db)
+    
+    return StreamingResponse(
+        chatbot_service.stream_response(
+            query=request.query,
+            context=context,
+            mode=batch.mode or "aicte"
+        ),
+        media_type="text/event-stream"
+    )
+
+
 # Keep old endpoint for backward compatibility
 @router.post("/chat")
 def chat_with_assistant(message: Dict[str, Any]):
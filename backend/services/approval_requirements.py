@@ -6,7 +6,7 @@ NO hardcoded/default outputs - all data derived from evidence.
 
 from typing import Dict, List, Any, Optional
 from config.database import get_db, close_db, Block, Batch
-from services.evidence_search import find_best_evidence, check_block_examined
+from services.evidence_search import find_best_evidence_batch, check_block_examined
 from services.approval_classifier import normalize_classification
 import logging
 
@@ -182,16 +182,21 @@ def check_approval_requirements(batch_id: str, approval_type: str = None) -> Dic
         missing_documents = []
         unknown_documents = []
         
+        # Find evidence for every required document in one walk over the batch's blocks
+        evidence_by_key = find_best_evidence_batch(
+            batch_id,
+            {key: config["aliases"] for key, config in required.items()},
+            min_confidence=0.40
+        )
+        
         for key, config in required.items():
-            aliases = config["aliases"]
             block_types = config["block_types"]
             description = config["description"]
             
             # Check if extraction was attempted for these block types
             examined = check_block_examined(batch_id, block_types)
             
-            # Find evidence using evidence_search service
-            evidence = find_best_evidence(batch_id, aliases, min_confidence=0.40)
+            evidence = evidence_by_key[key]
             
             if evidence and evidence.get("confidence", 0) >= 0.40:
                 # Document is present with sufficient confidence
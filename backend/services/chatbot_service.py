@@ -3,17 +3,151 @@ Chatbot Service for Smart Approval AI.
 Provides intelligent responses based on real extracted data.
 """
 
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Tuple
 from ai.openai_client import OpenAIClient
-import json
+from ai.completion_batcher import get_completion_batcher
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of memoized chatbot answers kept in memory
+RESPONSE_CACHE_SIZE = 1024
+
+# Response keywords (including inflections) that indicate a cited data source
+CITATION_KEYWORDS: Dict[str, frozenset] = {
+    "KPI Results": frozenset({"kpi", "kpis", "score", "scores", "scored", "scoring"}),
+    "Sufficiency Analysis": frozenset({"sufficiency", "sufficient", "insufficient"}),
+    "Compliance Results": frozenset({"compliance", "noncompliance", "flag", "flags", "flagged"}),
+    "Approval Readiness": frozenset({"approval", "approvals", "readiness"}),
+    "Trend Analysis": frozenset({"trend", "trends", "trending", "forecast", "forecasts", "forecasted"}),
+    "Institution Comparison": frozenset({"comparison", "comparisons", "compare", "compared", "comparing"}),
+    "Extracted Blocks": frozenset({"block", "blocks", "document", "documents", "documentation"}),
+}
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Non-numeric block_data fields kept when an oversized context is truncated
+TRUNCATION_KEEP_FIELDS = frozenset({"faculty_count", "total_students", "built_up_area", "placement_rate"})
+
+# Fallback intents recognized in one pass, checked in priority order
+_FALLBACK_INTENT_RE = re.compile(r"(?P<kpi>kpi|score)|(?P<approval>approval|readiness)")
+_FALLBACK_INTENT_PRIORITY = ("kpi", "approval")
+
+# Placeholder values that carry no information for the model
+_EMPTY_VALUES = (None, "", [], {})
+
+
+def _dumps(data: Any, indent: bool = False) -> str:
+    """Serialize to a JSON string with orjson; unknown types fall back to str()."""
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(data, default=str, option=option).decode("utf-8")
+
+
+def _compact(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop None/empty fields (recursively for nested dicts) before serialization."""
+    compacted = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            value = _compact(value)
+        if value not in _EMPTY_VALUES:
+            compacted[key] = value
+    return compacted
+
+
+# Chatbot uses a real OpenAI chat model rather than the extraction model
+CHATBOT_MODEL = "gpt-4o-mini"
+CHATBOT_FALLBACK_MODEL = "gpt-3.5-turbo"
+
+
+class _BlockRow(NamedTuple):
+    """Plain snapshot of the Block columns build_context reads."""
+    block_type: str
+    data: Dict[str, Any]
+    confidence: float
+    is_outdated: bool
+    is_low_quality: bool
+    is_invalid: bool
+    evidence_snippet: Optional[str]
+    evidence_page: Optional[int]
+    source_doc: Optional[str]
+
+
+# Block columns needed for chatbot context (for ORM load_only)
+CONTEXT_BLOCK_COLUMNS = tuple(_BlockRow._fields)
+
+
+def _merge_block_group(block_type: str, blocks: List[_BlockRow]) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    """
+    Merge all blocks of one type into aggregated data and a summary of the
+    most confident block. Returns (block_type, data, summary), both compacted.
+    """
+    merged: Dict[str, Any] = {}
+    summary: Optional[Dict[str, Any]] = None
+    
+    for block in blocks:
+        data = block.data
+        
+        # Merge data, preferring _num fields for numeric values
+        for key, value in data.items():
+            if key.endswith("_num") and isinstance(value, (int, float)):
+                # For numeric fields, take the maximum value
+                if key in merged:
+                    merged[key] = max(merged[key], value)
+                else:
+                    merged[key] = value
+            else:
+                # For non-numeric fields, update if not already present
+                if key not in merged or merged[key] in [None, "", []]:
+                    merged[key] = value
+        
+        # Build summary (keep most recent/confident block info)
+        if summary is None or block.confidence > summary.get("confidence", 0):
+            summary = {
+                "present": True,
+                "confidence": block.confidence,
+                "fields_count": len([k for k, v in data.items() if v not in [None, "", []]]),
+                "is_outdated": block.is_outdated,
+                "is_low_quality": block.is_low_quality,
+                "is_invalid": block.is_invalid,
+                "evidence_snippet": block.evidence_snippet[:300] if block.evidence_snippet else None,
+                "evidence_page": block.evidence_page,
+                "source_doc": block.source_doc,
+                "sample_fields": {k: v for k, v in list(data.items())[:5] if v not in [None, "", []]}  # Sample of extracted fields
+            }
+    
+    # Empty placeholders are billed as prompt tokens without adding information
+    return block_type, _compact(merged), _compact(summary or {})
+
 
 class ChatbotService:
     def __init__(self):
         self.ai_client = OpenAIClient()
+        # Chat calls go through the shared coalescing dispatcher
+        self.batcher = get_completion_batcher()
+        # LRU of serialized answers keyed by (mode, normalized query, context digest)
+        self._response_cache: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+    
+    def _get_cached_response(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        with self._response_cache_lock:
+            cached = self._response_cache.get(key)
+            if cached is None:
+                return None
+            self._response_cache.move_to_end(key)
+        return orjson.loads(cached)
+    
+    def _store_cached_response(self, key: Tuple[str, str, str], result: Dict[str, Any]) -> None:
+        serialized = _dumps(result)
+        with self._response_cache_lock:
+            self._response_cache[key] = serialized
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
     
     def build_context(
         self,
@@ -26,45 +160,27 @@ class ChatbotService:
         """
         Build comprehensive context from batch data.
         """
-        # Aggregate block data
-        block_data = {}
-        block_summaries = {}
-        
+        # Read each ORM attribute once into plain rows, then group by type;
+        # each group is merged independently
+        groups: Dict[str, List[_BlockRow]] = {}
         for block in blocks:
-            block_type = block.block_type
-            data = block.data or {}
-            
-            # Aggregate data (merge multiple blocks of same type)
-            if block_type not in block_data:
-                block_data[block_type] = {}
-            
-            # Merge data, preferring _num fields for numeric values
-            for key, value in data.items():
-                if key.endswith("_num") and isinstance(value, (int, float)):
-                    # For numeric fields, take the maximum value
-                    if key in block_data[block_type]:
-                        block_data[block_type][key] = max(block_data[block_type][key], value)
-                    else:
-                        block_data[block_type][key] = value
-                else:
-                    # For non-numeric fields, update if not already present
-                    if key not in block_data[block_type] or block_data[block_type][key] in [None, "", []]:
-                        block_data[block_type][key] = value
-            
-            # Build summary (keep most recent/confident block info)
-            if block_type not in block_summaries or block.confidence > block_summaries[block_type].get("confidence", 0):
-                block_summaries[block_type] = {
-                    "present": True,
-                    "confidence": block.confidence,
-                    "fields_count": len([k for k, v in data.items() if v not in [None, "", []]]),
-                    "is_outdated": bool(block.is_outdated),
-                    "is_low_quality": bool(block.is_low_quality),
-                    "is_invalid": bool(block.is_invalid),
-                    "evidence_snippet": block.evidence_snippet[:300] if block.evidence_snippet else None,
-                    "evidence_page": block.evidence_page,
-                    "source_doc": block.source_doc,
-                    "sample_fields": {k: v for k, v in list(data.items())[:5] if v not in [None, "", []]}  # Sample of extracted fields
-                }
+            row = _BlockRow(
+                block.block_type,
+                block.data or {},
+                block.confidence,
+                bool(block.is_outdated),
+                bool(block.is_low_quality),
+                bool(block.is_invalid),
+                block.evidence_snippet,
+                block.evidence_page,
+                block.source_doc
+            )
+            groups.setdefault(row.block_type, []).append(row)
+        
+        merged = [_merge_block_group(block_type, group) for block_type, group in groups.items()]
+        
+        block_data = {block_type: data for block_type, data, _ in merged}
+        block_summaries = {block_type: summary for block_type, _, summary in merged}
         
         # Build context
         context = {
@@ -198,7 +314,7 @@ CRITICAL RULES:
    "This information is not available in your uploaded documents."
 
 5. When explaining KPIs, use the exact formulas provided:
-{json.dumps(formulas, indent=2)}
+{_dumps(formulas, indent=True)}
 
 6. When explaining missing documents, reference the approval_readiness data.
 
@@ -214,6 +330,52 @@ CRITICAL RULES:
 
 10. Be concise but thorough. Provide actionable insights when possible."""
     
+    def _build_messages(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        context_json: str,
+        system_prompt: str
+    ) -> List[Dict[str, str]]:
+        """
+        Build chat messages, truncating block_data first if the context is too large.
+        """
+        # Truncate context if too large (OpenAI has token limits)
+        # Keep essential data but limit block_data size
+        context_size = len(context_json)
+        if context_size > 50000:  # Roughly 12k tokens, leave room for prompt
+            logger.warning(f"Context is large ({context_size} chars), truncating block_data")
+            # Keep summaries but truncate detailed block_data
+            for block_type in list(context.get("block_data", {}).keys()):
+                block_data = context["block_data"][block_type]
+                # Keep only _num fields and essential fields
+                truncated = {k: v for k, v in block_data.items() if k.endswith("_num") or k in TRUNCATION_KEEP_FIELDS}
+                context["block_data"][block_type] = truncated
+            context_json = _dumps(context, indent=True)
+        logger.debug(f"Context size: {len(context_json)} characters")
+        
+        user_prompt = f"""User Question: {query}
+
+Available Context Data:
+{context_json}
+
+Please answer the user's question using ONLY the context data provided above. 
+If the question is outside the platform scope, politely redirect.
+If data is missing, state that clearly.
+If explaining KPIs, use the formulas provided in the system prompt."""
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def _response_cache_key(self, query_lower: str, context_json: str, mode: str) -> Tuple[str, str, str]:
+        return (
+            mode.lower(),
+            " ".join(query_lower.split()),
+            hashlib.sha1(context_json.encode("utf-8")).hexdigest()
+        )
+    
     def generate_response(
         self,
         query: str,
@@ -230,47 +392,30 @@ CRITICAL RULES:
         system_prompt = self.build_system_prompt(mode, formulas)
         
         # Build user prompt with context
-        context_json = json.dumps(context, indent=2, default=str)
+        context_json = _dumps(context, indent=True)
+        # Lowercase once; cache key, related-block and fallback scans share it
+        query_lower = query.lower()
+        
+        # Repeated questions against unchanged data skip the OpenAI call
+        cache_key = self._response_cache_key(query_lower, context_json, mode)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            logger.info("Chatbot response served from cache")
+            return cached
         
-        user_prompt = f"""User Question: {query}
-
-Available Context Data:
-{context_json}
-
-Please answer the user's question using ONLY the context data provided above. 
-If the question is outside the platform scope, politely redirect.
-If data is missing, state that clearly.
-If explaining KPIs, use the formulas provided in the system prompt."""
-
         # Generate response using GPT-5 Nano
         try:
-            # Truncate context if too large (OpenAI has token limits)
-            # Keep essential data but limit block_data size
-            context_size = len(context_json)
-            if context_size > 50000:  # Roughly 12k tokens, leave room for prompt
-                logger.warning(f"Context is large ({context_size} chars), truncating block_data")
-                # Keep summaries but truncate detailed block_data
-                for block_type in list(context.get("block_data", {}).keys()):
-                    block_data = context["block_data"][block_type]
-                    # Keep only _num fields and essential fields
-                    truncated = {k: v for k, v in block_data.items() if k.endswith("_num") or k in ["faculty_count", "total_students", "built_up_area", "placement_rate"]}
-                    context["block_data"][block_type] = truncated
-                context_json = json.dumps(context, indent=2, default=str)
+            messages = self._build_messages(query, context, context_json, system_prompt)
             
             # Use gpt-4o-mini specifically for chatbot (not the global model)
             # This keeps extraction using gpt-5-nano while chatbot uses a real OpenAI model
             logger.info(f"Generating chatbot response using gpt-4o-mini for mode: {mode}, query length: {len(query)}")
-            logger.debug(f"Context size: {len(context_json)} characters")
             
             # Make direct OpenAI API call with gpt-4o-mini
-            CHATBOT_MODEL = "gpt-4o-mini"
             try:
-                response = self.ai_client.client.chat.completions.create(
+                response = self.batcher.create(
                     model=CHATBOT_MODEL,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
+                    messages=messages,
                     temperature=0.3,
                     max_tokens=1500,
                     timeout=60
@@ -279,12 +424,9 @@ If explaining KPIs, use the formulas provided in the system prompt."""
             except Exception as direct_err:
                 logger.warning(f"gpt-4o-mini failed: {direct_err}, trying fallback")
                 # Fallback to gpt-3.5-turbo if gpt-4o-mini fails
-                response = self.ai_client.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
+                response = self.batcher.create(
+                    model=CHATBOT_FALLBACK_MODEL,
+                    messages=messages,
                     temperature=0.3,
                     max_tokens=1500,
                     timeout=60
@@ -297,83 +439,154 @@ If explaining KPIs, use the formulas provided in the system prompt."""
             logger.info("Chatbot response generated successfully using gpt-4o-mini")
             
             # Extract citations and related blocks
-            citations = self._extract_citations(response_text, context)
-            related_blocks = self._extract_related_blocks(query, context)
+            response_lower = response_text.lower()
+            citations = self._extract_citations(response_lower, context)
+            related_blocks = self._extract_related_blocks(query_lower, context)
             
-            return {
+            result = {
                 "answer": response_text,
                 "citations": citations,
                 "related_blocks": related_blocks,
                 "requires_context": False
             }
+            self._store_cached_response(cache_key, result)
+            return result
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
             logger.error(f"Error generating chatbot response: {e}")
             logger.error(f"Error details: {error_details}")
-            
-            # Provide a more helpful error message
-            error_msg = str(e).lower()
-            if "api key" in error_msg or "authentication" in error_msg:
-                return {
-                    "answer": "I apologize, but there's an authentication issue with the AI service. Please contact support.",
-                    "citations": [],
-                    "related_blocks": [],
-                    "requires_context": False
-                }
-            elif "rate limit" in error_msg or "quota" in error_msg:
-                return {
-                    "answer": "I apologize, but the AI service is currently rate-limited. Please try again in a moment.",
-                    "citations": [],
-                    "related_blocks": [],
-                    "requires_context": False
-                }
-            elif "model" in error_msg or "not found" in error_msg:
-                return {
-                    "answer": "I apologize, but there's an issue with the AI model configuration. Please contact support.",
-                    "citations": [],
-                    "related_blocks": [],
-                    "requires_context": False
-                }
-            else:
-                # For other errors, try to provide a basic response based on context
-                return self._generate_fallback_response(query, context, mode)
+            return self._error_response(e, query_lower, context, mode)
     
-    def _extract_citations(self, response: str, context: Dict[str, Any]) -> List[str]:
-        """
-        Extract citation sources from response.
+    def _error_response(
+        self,
+        error: Exception,
+        query_lower: str,
+        context: Dict[str, Any],
+        mode: str
+    ) -> Dict[str, Any]:
+        """Response for a failed AI call, shared by the plain and streaming paths."""
+        # Provide a more helpful error message
+        error_msg = str(error).lower()
+        if "api key" in error_msg or "authentication" in error_msg:
+            return {
+                "answer": "I apologize, but there's an authentication issue with the AI service. Please contact support.",
+                "citations": [],
+                "related_blocks": [],
+                "requires_context": False
+            }
+        elif "rate limit" in error_msg or "quota" in error_msg:
+            return {
+                "answer": "I apologize, but the AI service is currently rate-limited. Please try again in a moment.",
+                "citations": [],
+                "related_blocks": [],
+                "requires_context": False
+            }
+        elif "model" in error_msg or "not found" in error_msg:
+            return {
+                "answer": "I apologize, but there's an issue with the AI model configuration. Please contact support.",
+                "citations": [],
+                "related_blocks": [],
+                "requires_context": False
+            }
+        else:
+            # For other errors, try to provide a basic response based on context
+            return self._generate_fallback_response(query_lower, context, mode)
+    
+    def stream_response(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        mode: str
+    ) -> Iterator[str]:
         """
-        citations = []
-        
-        # Check which data sources were likely used
-        if "kpi" in response.lower() or "score" in response.lower():
-            citations.append("KPI Results")
-        
-        if "sufficiency" in response.lower() or "sufficient" in response.lower():
-            citations.append("Sufficiency Analysis")
+        Stream chatbot response as server-sent events.
         
-        if "compliance" in response.lower() or "flag" in response.lower():
-            citations.append("Compliance Results")
-        
-        if "approval" in response.lower() or "readiness" in response.lower():
-            citations.append("Approval Readiness")
+        Emits "delta" events with answer chunks as they arrive, then a final
+        "done" event carrying the full result with citations and related blocks.
+        """
+        system_prompt = self.build_system_prompt(mode, self.get_kpi_formulas(mode))
+        context_json = _dumps(context, indent=True)
+        query_lower = query.lower()
         
-        if "trend" in response.lower() or "forecast" in response.lower():
-            citations.append("Trend Analysis")
+        cache_key = self._response_cache_key(query_lower, context_json, mode)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            yield self._sse_event("delta", {"content": cached["answer"]})
+            yield self._sse_event("done", cached)
+            return
         
-        if "comparison" in response.lower() or "compare" in response.lower():
-            citations.append("Institution Comparison")
+        messages = self._build_messages(query, context, context_json, system_prompt)
+        parts: List[str] = []
+        try:
+            try:
+                stream = self.ai_client.client.chat.completions.create(
+                    model=CHATBOT_MODEL,
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=1500,
+                    timeout=60,
+                    stream=True
+                )
+            except Exception as direct_err:
+                logger.warning(f"gpt-4o-mini stream failed: {direct_err}, trying fallback")
+                stream = self.ai_client.client.chat.completions.create(
+                    model=CHATBOT_FALLBACK_MODEL,
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=1500,
+                    timeout=60,
+                    stream=True
+                )
+            
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield self._sse_event("delta", {"content": delta})
+            response_text = "".join(parts)
+            
+            if not response_text.strip():
+                raise ValueError("Empty response from AI client")
+        except Exception as e:
+            logger.error(f"Error streaming chatbot response: {e}")
+            if parts:
+                # Partial answer already reached the client; close the stream cleanly
+                yield self._sse_event("error", {"detail": str(e)[:200]})
+                return
+            fallback = self._error_response(e, query_lower, context, mode)
+            yield self._sse_event("delta", {"content": fallback["answer"]})
+            yield self._sse_event("done", fallback)
+            return
         
-        if "block" in response.lower() or "document" in response.lower():
-            citations.append("Extracted Blocks")
+        # Citation extraction runs after the last chunk, off the critical path
+        result = {
+            "answer": response_text,
+            "citations": self._extract_citations(response_text.lower(), context),
+            "related_blocks": self._extract_related_blocks(query_lower, context),
+            "requires_context": False
+        }
+        self._store_cached_response(cache_key, result)
+        yield self._sse_event("done", result)
+    
+    @staticmethod
+    def _sse_event(event: str, payload: Dict[str, Any]) -> str:
+        return f"event: {event}\ndata: {_dumps(payload)}\n\n"
+    
+    def _extract_citations(self, response_lower: str, context: Dict[str, Any]) -> List[str]:
+        """
+        Extract citation sources from the lowercased response.
+        """
+        # Check which data sources were likely used
+        tokens = set(_WORD_RE.findall(response_lower))
+        citations = [label for label, keywords in CITATION_KEYWORDS.items() if tokens & keywords]
         
         return citations if citations else ["Dashboard Data"]
     
-    def _extract_related_blocks(self, query: str, context: Dict[str, Any]) -> List[str]:
+    def _extract_related_blocks(self, query_lower: str, context: Dict[str, Any]) -> List[str]:
         """
-        Extract related block types from query.
+        Extract related block types from the lowercased query.
         """
-        query_lower = query.lower()
         related = []
         
         block_keywords = {
@@ -400,51 +613,22 @@ If explaining KPIs, use the formulas provided in the system prompt."""
     
     def _generate_fallback_response(
         self,
-        query: str,
+        query_lower: str,
         context: Dict[str, Any],
         mode: str
     ) -> Dict[str, Any]:
         """
-        Generate a fallback response when AI fails, using simple pattern matching.
+        Generate a fallback response when AI fails, using simple pattern matching
+        on the lowercased query.
         """
-        query_lower = query.lower()
-        
-        # KPI-related queries
-        if "kpi" in query_lower or "score" in query_lower:
-            kpi_results = context.get("kpi_results", {})
-            if kpi_results:
-                response = "Here are your KPI scores:\n\n"
-                for kpi_id, kpi_data in kpi_results.items():
-                    if isinstance(kpi_data, dict):
-                        name = kpi_data.get("name", kpi_id)
-                        value = kpi_data.get("value")
-                        if value is not None:
-                            response += f"- **{name}**: {value:.2f}\n"
-                        else:
-                            response += f"- **{name}**: Not available\n"
-                response += "\nFor detailed explanations, please ensure the AI service is properly configured."
-                return {
-                    "answer": response,
-                    "citations": ["KPI Results"],
-                    "related_blocks": [],
-                    "requires_context": False
-                }
-        
-        # Approval-related queries
-        if "approval" in query_lower or "readiness" in query_lower:
-            readiness = context.get("approval_readiness", {})
-            if readiness:
-                score = readiness.get("approval_readiness_score", "N/A")
-                response = f"Your approval readiness score is **{score}%**.\n\n"
-                missing = readiness.get("approval_missing_documents", [])
-                if missing:
-                    response += f"Missing documents: {', '.join(missing[:5])}\n"
-                return {
-                    "answer": response,
-                    "citations": ["Approval Readiness"],
-                    "related_blocks": [],
-                    "requires_context": False
-                }
+        # Classify the query in one regex pass; handlers run in priority order
+        # and return None when their context data is missing
+        intents = {match.lastgroup for match in _FALLBACK_INTENT_RE.finditer(query_lower)}
+        for intent in _FALLBACK_INTENT_PRIORITY:
+            if intent in intents:
+                result = self._FALLBACK_HANDLERS[intent](self, context)
+                if result is not None:
+                    return result
         
         # Default fallback
         return {
@@ -453,4 +637,48 @@ If explaining KPIs, use the formulas provided in the system prompt."""
             "related_blocks": [],
             "requires_context": False
         }
-
+    
+    def _fallback_kpi_response(self, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """KPI-related fallback: list available KPI scores."""
+        kpi_results = context.get("kpi_results", {})
+        if not kpi_results:
+            return None
+        parts = ["Here are your KPI scores:\n\n"]
+        for kpi_id, kpi_data in kpi_results.items():
+            if isinstance(kpi_data, dict):
+                name = kpi_data.get("name", kpi_id)
+                value = kpi_data.get("value")
+                if value is not None:
+                    parts.append(f"- **{name}**: {value:.2f}\n")
+                else:
+                    parts.append(f"- **{name}**: Not available\n")
+        parts.append("\nFor detailed explanations, please ensure the AI service is properly configured.")
+        return {
+            "answer": "".join(parts),
+            "citations": ["KPI Results"],
+            "related_blocks": [],
+            "requires_context": False
+        }
+    
+    def _fallback_approval_response(self, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Approval-related fallback: readiness score and missing documents."""
+        readiness = context.get("approval_readiness", {})
+        if not readiness:
+            return None
+        score = readiness.get("approval_readiness_score", "N/A")
+        parts = [f"Your approval readiness score is **{score}%**.\n\n"]
+        missing = readiness.get("approval_missing_documents", [])
+        if missing:
+            parts.append(f"Missing documents: {', '.join(missing[:5])}\n")
+        return {
+            "answer": "".join(parts),
+            "citations": ["Approval Readiness"],
+            "related_blocks": [],
+            "requires_context": False
+        }
+    
+    # Fallback intent -> handler, resolved once at class creation rather than per fallback
+    _FALLBACK_HANDLERS = {
+        "kpi": _fallback_kpi_response,
+        "approval": _fallback_approval_response,
+    }
@@ -4,32 +4,444 @@ Mode-specific compliance checks for AICTE and UGC
 Uses fuzzy/synonym-aware matching for compliance certificates
 """
 
-from typing import List, Dict, Any
+import hashlib
+import re
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import List, Dict, Any, FrozenSet, NamedTuple, Optional, Tuple
+import orjson
 from datetime import datetime, timezone
 from config.rules import get_compliance_rules
+from config.information_blocks import BLOCK_FIELDS
 from utils.parse_numeric import parse_numeric
+try:
+    from rapidfuzz import fuzz, process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+try:
+    # process.cdist returns a numpy score matrix
+    import numpy as np
+    RAPIDFUZZ_CDIST_AVAILABLE = RAPIDFUZZ_AVAILABLE
+except ImportError:
+    RAPIDFUZZ_CDIST_AVAILABLE = False
 try:
     from difflib import SequenceMatcher
 except ImportError:
     SequenceMatcher = None
 
+
+# Block types whose evidence + data text is lowercased during aggregation
+TEXT_SCAN_BLOCK_TYPES = frozenset({"safety_compliance_information"})
+
+# Certificate / committee synonym sets (tuples so they can key the matcher caches)
+FIRE_NOC_SYNONYMS = (
+    "Fire NOC", "Fire Safety NOC", "Fire Safety Certificate", "Fire NOC certificate",
+    "Fire clearance", "Fire safety clearance"
+)
+BUILDING_SYNONYMS = (
+    "Building Structural Safety Certificate", "Building Stability Certificate",
+    "Structural Safety Certificate", "Building Safety Certificate", "Structural Certificate"
+)
+SANITARY_SYNONYMS = (
+    "Sanitary Certificate", "Environmental Clearance",
+    "Sanitary Certificate or Environmental Clearance", "Environmental Certificate"
+)
+ICC_SYNONYMS = (
+    "ICC", "Internal Complaints Committee", "Internal Complaint Committee", "ICC Committee",
+    "Internal Complaints"
+)
+ANTI_RAGGING_SYNONYMS = (
+    "Anti-Ragging Committee", "Anti Ragging Committee", "Anti-Ragging", "Anti Ragging",
+    "Ragging Prevention Committee"
+)
+
+
+# Flag templates; checks append a copy so callers may mutate their results.
+# "{}" in a reason is filled with the missing items.
+_FLAG_FIRE_NOC_MISSING = {
+    "severity": "high",
+    "title": "Missing or Invalid Fire NOC",
+    "reason": "Fire NOC certificate is missing or not valid for current year",
+    "recommendation": "Obtain valid Fire NOC certificate for current year"
+}
+_FLAG_BUILDING_CERT_MISSING = {
+    "severity": "high",
+    "title": "Missing Building Stability Certificate",
+    "reason": "Building Stability Certificate is missing",
+    "recommendation": "Submit Building Stability Certificate"
+}
+_FLAG_SANITARY_EXPIRED = {
+    "severity": "low",  # Sanitary certificate missing → LOW severity
+    "title": "Sanitary Certificate Expired",
+    "reason": "Sanitary Certificate or Environmental Clearance is expired or invalid",
+    "recommendation": "Renew Sanitary Certificate"
+}
+_FLAG_COMMITTEES_MISSING = {
+    "severity": "high",
+    "title": "Missing Mandatory Committees",
+    "reason": "Required committees not found: {}",
+    "recommendation": "Establish and document all mandatory committees"
+}
+_FLAG_GOVERNANCE_MISSING = {
+    "severity": "high",
+    "title": "Missing Governance Bodies",
+    "reason": "Required governance bodies not found: {}",
+    "recommendation": "Establish and document all required governance bodies"
+}
+_FLAG_IQAC_MISSING = {
+    "severity": "high",
+    "title": "IQAC Not Established",
+    "reason": "Internal Quality Assurance Cell (IQAC) is not established",
+    "recommendation": "Establish IQAC as per UGC guidelines"
+}
+_FLAG_UGC_REGULATIONS = {
+    "severity": "high",
+    "title": "UGC Regulations 2018 Non-Compliance",
+    "reason": "UGC Regulations 2018 compliance not confirmed",
+    "recommendation": "Ensure full compliance with UGC Regulations 2018"
+}
+_FLAG_FINANCIAL_MISSING = {
+    "severity": "medium",
+    "title": "Financial Information Missing",
+    "reason": "Annual budget information is missing",
+    "recommendation": "Submit complete financial information demonstrating viability"
+}
+_FLAG_STATUTORY_MISSING = {
+    "severity": "medium",
+    "title": "Statutory Committees Missing",
+    "reason": "Statutory committees information is missing",
+    "recommendation": "Document all statutory committees"
+}
+
+
+class _SynonymTable(NamedTuple):
+    """Per-synonym-set precomputation, stored as parallel arrays."""
+    lowers: Tuple[str, ...]
+    # Bit per distinct synonym token; each synonym's token set as a bitmask
+    token_bits: Dict[str, int]
+    token_masks: Tuple[int, ...]
+    pattern: "re.Pattern[str]"
+
+
+@lru_cache(maxsize=256)
+def _synonym_table(synonyms: Tuple[str, ...]) -> _SynonymTable:
+    """Lowercase, tokenize and compile a synonym set once."""
+    lowers = tuple(synonym.lower() for synonym in synonyms)
+    # One alternation over all synonyms, so a single scan finds any of them
+    alternatives = sorted(lowers, key=len, reverse=True)
+    token_bits: Dict[str, int] = {}
+    for synonym in lowers:
+        for token in synonym.split():
+            token_bits.setdefault(token, 1 << len(token_bits))
+    token_masks = []
+    for synonym in lowers:
+        mask = 0
+        for token in synonym.split():
+            mask |= token_bits[token]
+        token_masks.append(mask)
+    return _SynonymTable(
+        lowers=lowers,
+        token_bits=token_bits,
+        token_masks=tuple(token_masks),
+        pattern=re.compile("|".join(re.escape(synonym) for synonym in alternatives))
+    )
+
+
+def _substring_match(text_lower: str, table: _SynonymTable) -> bool:
+    """Exact substring match (case-insensitive), both directions."""
+    if table.pattern.search(text_lower):
+        return True
+    for synonym in table.lowers:
+        if text_lower in synonym:
+            return True
+    return False
+
+
+def _token_overlap_match(text_lower: str, table: _SynonymTable) -> bool:
+    """Fallback: at least 2 common words with any synonym."""
+    token_bits = table.token_bits
+    text_mask = 0
+    for token in text_lower.split():
+        text_mask |= token_bits.get(token, 0)
+    # Fewer than 2 tokens shared with the whole vocabulary means no synonym can match
+    if text_mask.bit_count() < 2:
+        return False
+    for synonym_mask in table.token_masks:
+        if (text_mask & synonym_mask).bit_count() >= 2:
+            return True
+    return False
+
+
+def _rapidfuzz_any(text_lower: str, synonyms_lower: Tuple[str, ...], threshold: float) -> bool:
+    """RapidFuzz (C++) similarity: any synonym at or above the threshold."""
+    best = process.extractOne(
+        text_lower, synonyms_lower, scorer=fuzz.ratio, processor=None, score_cutoff=threshold * 100
+    )
+    return best is not None
+
+
+def _sequence_matcher_any(text_lower: str, synonyms_lower: Tuple[str, ...], threshold: float) -> bool:
+    """difflib similarity: any synonym at or above the threshold."""
+    text_len = len(text_lower)
+    for synonym in synonyms_lower:
+        # ratio() can never exceed 2*min(len)/total, so skip hopeless pairs
+        # before building a matcher; quick_ratio() is a cheaper upper bound
+        total_len = text_len + len(synonym)
+        if 2.0 * min(text_len, len(synonym)) < threshold * total_len:
+            continue
+        matcher = SequenceMatcher(None, text_lower, synonym)
+        if matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold:
+            return True
+    return False
+
+
+def _no_fuzzy_any(text_lower: str, synonyms_lower: Tuple[str, ...], threshold: float) -> bool:
+    """No similarity backend available."""
+    return False
+
+
+# Similarity backend chosen once at import: RapidFuzz > difflib > none
+if RAPIDFUZZ_AVAILABLE:
+    _FUZZY_ANY = _rapidfuzz_any
+elif SequenceMatcher is not None:
+    _FUZZY_ANY = _sequence_matcher_any
+else:
+    _FUZZY_ANY = _no_fuzzy_any
+
+
+@lru_cache(maxsize=4096)
+def _fuzzy_match_cached(text_lower: str, synonyms: Tuple[str, ...], threshold: float) -> bool:
+    """
+    Pure fuzzy match of lowercased text against a synonym tuple.
+    Memoized because the same keys and snippets are matched against the
+    same synonym sets many times per compliance run.
+    """
+    table = _synonym_table(synonyms)
+    
+    # First try exact substring match (case-insensitive), both directions
+    if _substring_match(text_lower, table):
+        return True
+    
+    # Then try fuzzy similarity with the backend bound at import
+    if _FUZZY_ANY(text_lower, table.lowers, threshold):
+        return True
+    
+    # Fallback: token overlap
+    return _token_overlap_match(text_lower, table)
+
+
+# Below this many field names, a cdist call costs more than per-key matching
+CDIST_MIN_KEYS = 8
+
+
+# Certificate / committee categories checked against extractor field names
+COMPLIANCE_CATEGORIES = {
+    "fire_noc": FIRE_NOC_SYNONYMS,
+    "building_safety": BUILDING_SYNONYMS,
+    "sanitary": SANITARY_SYNONYMS,
+    "icc": ICC_SYNONYMS,
+    "anti_ragging": ANTI_RAGGING_SYNONYMS,
+}
+_SYNONYM_CATEGORIES = {synonyms: category for category, synonyms in COMPLIANCE_CATEGORIES.items()}
+
+# Threshold the field index is built with (the default used by the checks)
+FIELD_INDEX_THRESHOLD = 0.75
+
+
+def _build_field_index() -> Dict[str, FrozenSet[str]]:
+    """Map every known extractor field name to the categories it fuzzy-matches."""
+    field_names = set()
+    for mode_blocks in BLOCK_FIELDS.values():
+        for fields in mode_blocks.values():
+            field_names.update(fields.get("required_fields", []))
+            field_names.update(fields.get("optional_fields", []))
+    return {
+        name: frozenset(
+            category for category, synonyms in COMPLIANCE_CATEGORIES.items()
+            if _fuzzy_match_cached(name.lower(), synonyms, FIELD_INDEX_THRESHOLD)
+        )
+        for name in field_names
+    }
+
+
+# Known field name -> matching categories, so extractor keys resolve by dict lookup
+FIELD_TO_CATEGORIES = _build_field_index()
+
+
+@lru_cache(maxsize=1024)
+def _fuzzy_match_keys(keys: Tuple[str, ...], synonyms: Tuple[str, ...], threshold: float) -> Tuple[bool, ...]:
+    """
+    Fuzzy-match many field names against one synonym set.
+    Field names known to the extractor are answered from FIELD_TO_CATEGORIES;
+    only unknown keys are scored.
+    """
+    category = _SYNONYM_CATEGORIES.get(synonyms) if threshold == FIELD_INDEX_THRESHOLD else None
+    if category is None:
+        return _score_keys(keys, synonyms, threshold)
+    
+    matches = [False] * len(keys)
+    unknown = []
+    for index, key in enumerate(keys):
+        categories = FIELD_TO_CATEGORIES.get(key)
+        if categories is None:
+            unknown.append(index)
+        else:
+            matches[index] = category in categories
+    
+    if unknown:
+        scored = _score_keys(tuple(keys[index] for index in unknown), synonyms, threshold)
+        for index, matched in zip(unknown, scored):
+            matches[index] = matched
+    
+    return tuple(matches)
+
+
+def _score_keys(keys: Tuple[str, ...], synonyms: Tuple[str, ...], threshold: float) -> Tuple[bool, ...]:
+    """
+    Fuzzy-score field names against one synonym set.
+    With RapidFuzz, every key that misses the substring check is scored in a
+    single cdist call instead of one similarity call per key.
+    """
+    if not RAPIDFUZZ_CDIST_AVAILABLE or len(keys) < CDIST_MIN_KEYS:
+        # Few keys: per-key matching is cheaper and reuses the per-text cache
+        return tuple(
+            bool(key) and isinstance(key, str) and _fuzzy_match_cached(key.lower(), synonyms, threshold)
+            for key in keys
+        )
+    
+    table = _synonym_table(synonyms)
+    keys_lower = [key.lower() if isinstance(key, str) else "" for key in keys]
+    matches = [False] * len(keys)
+    pending = []
+    for index, key_lower in enumerate(keys_lower):
+        if not key_lower:
+            continue
+        if _substring_match(key_lower, table):
+            matches[index] = True
+        else:
+            pending.append(index)
+    
+    if pending:
+        cutoff = threshold * 100
+        scores = process.cdist(
+            [keys_lower[index] for index in pending], table.lowers,
+            scorer=fuzz.ratio, processor=None, score_cutoff=cutoff, dtype=np.float64
+        )
+        for index, similar in zip(pending, (scores >= cutoff).any(axis=1)):
+            matches[index] = bool(similar) or _token_overlap_match(keys_lower[index], table)
+    
+    return tuple(matches)
+
+
+def _is_present_value(value: Any) -> bool:
+    """Whether a certificate field value indicates the certificate exists."""
+    return value is True or (isinstance(value, str) and value.lower() not in ["none", "null", "n/a"])
+
+
+def _aggregate_values(values: List[Any]) -> Any:
+    """
+    Combine one field's values across blocks: a falsy value is replaced by
+    the next one, and numbers keep the maximum.
+    """
+    # Only non-zero plain numbers: the fold below reduces to a single max()
+    if all(type(value) in (int, float) and value for value in values):
+        return max(values)
+    
+    aggregated = values[0]
+    for value in values[1:]:
+        if not aggregated:
+            aggregated = value
+        elif isinstance(value, (int, float)) and isinstance(aggregated, (int, float)):
+            aggregated = max(aggregated, value)
+    return aggregated
+
+
+class _BlockIndex(NamedTuple):
+    """Blocks grouped by block_type, built in the single aggregation pass."""
+    blocks: Dict[str, List[Dict[str, Any]]]
+    # Lowercased evidence_snippet per block, parallel to `blocks`
+    evidence_lower: Dict[str, List[str]]
+    # Lowercased evidence + data text per block, for TEXT_SCAN_BLOCK_TYPES only
+    corpora: Dict[str, List[str]]
+
+
+# Whole-result LRU for check_compliance, keyed by (mode, digest of the blocks)
+RESULT_CACHE_SIZE = 128
+_result_cache: "OrderedDict[Tuple[str, str], List[Dict[str, Any]]]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def _result_cache_key(mode: str, blocks: Optional[List[Dict[str, Any]]]) -> Optional[Tuple[str, str]]:
+    """Stable key for a compliance run, or None if the blocks cannot be serialized."""
+    try:
+        serialized = orjson.dumps(
+            blocks or [], default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )
+    except TypeError:
+        return None
+    return mode.lower(), hashlib.sha1(serialized).hexdigest()
+
+
+def _get_cached_result(key: Tuple[str, str]) -> Optional[List[Dict[str, Any]]]:
+    with _result_cache_lock:
+        cached = _result_cache.get(key)
+        if cached is None:
+            return None
+        _result_cache.move_to_end(key)
+    # Flags are flat dicts of strings; copy so callers can mutate them freely
+    return [dict(flag) for flag in cached]
+
+
+def _store_cached_result(key: Tuple[str, str], flags: List[Dict[str, Any]]) -> None:
+    stored = [dict(flag) for flag in flags]
+    with _result_cache_lock:
+        _result_cache[key] = stored
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+
 class ComplianceService:
     def check_compliance(
         self,
         mode: str,
-        blocks: List[Dict[str, Any]] = None
+        blocks: List[Dict[str, Any]] = None,
+        use_cache: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Check compliance rules and return flags based on information blocks
+        Identical (mode, blocks) runs are served from an LRU unless use_cache is False.
         Returns: List of {severity, title, reason, evidence, recommendation}
         """
-        flags = []
-        
-        # Aggregate extracted data from blocks
-        extracted_data = {}
+        cache_key = _result_cache_key(mode, blocks) if use_cache else None
+        if cache_key is not None:
+            cached = _get_cached_result(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Aggregate extracted data from blocks and index blocks by type in one pass;
+        # the index keeps invalid blocks since the mode checks inspect every block
+        # Non-empty values per field across valid blocks, in block order
+        values_by_key: Dict[str, List[Any]] = defaultdict(list)
+        index = _BlockIndex(blocks=defaultdict(list), evidence_lower=defaultdict(list), corpora=defaultdict(list))
         if blocks:
             # Aggregate from blocks (skip invalid blocks)
             for block in blocks:
+                block_type = block.get("block_type")
+                if isinstance(block_type, str):
+                    # Interned so the by-type dict lookups hit the identity fast path
+                    block_type = sys.intern(block_type)
+                # Lowercase each evidence snippet once; every synonym check reuses it
+                evidence_lower = (block.get("evidence_snippet") or "").lower()
+                index.blocks[block_type].append(block)
+                index.evidence_lower[block_type].append(evidence_lower)
+                if block_type in TEXT_SCAN_BLOCK_TYPES:
+                    index.corpora[block_type].append(
+                        evidence_lower + " " + str(block.get("extracted_data", {})).lower()
+                    )
                 if block.get("is_invalid", False):
                     continue
                     
@@ -37,217 +449,165 @@ class ComplianceService:
                 if data:
                     for key, value in data.items():
                         if value is not None and value != "":
-                            if key not in extracted_data or not extracted_data[key]:
-                                extracted_data[key] = value
-                            elif isinstance(value, (int, float)) and isinstance(extracted_data.get(key), (int, float)):
-                                extracted_data[key] = max(extracted_data[key], value)
+                            values_by_key[key].append(value)
+        extracted_data = {key: _aggregate_values(values) for key, values in values_by_key.items()}
         
         # Run mode-specific compliance checks
-        if mode.lower() == "aicte":
-            flags.extend(self._check_aicte_compliance(blocks, extracted_data, mode))
-        elif mode.lower() == "ugc":
-            flags.extend(self._check_ugc_compliance(blocks, extracted_data, mode))
+        check = self._MODE_CHECKS.get(mode.lower())
+        flags = check(self, index, extracted_data, mode) if check else []
         
+        if cache_key is not None:
+            _store_cached_result(cache_key, flags)
         return flags
     
     def _fuzzy_match(self, text: str, synonyms: List[str], threshold: float = 0.75) -> bool:
         """
         Check if text matches any synonym using fuzzy matching.
-        Uses SequenceMatcher for similarity or simple substring matching.
+        Uses RapidFuzz/SequenceMatcher for similarity or simple substring matching.
         """
         if not text or not isinstance(text, str):
             return False
         
-        text_lower = text.lower()
-        
-        # First try exact substring match (case-insensitive)
-        for synonym in synonyms:
-            if synonym.lower() in text_lower or text_lower in synonym.lower():
-                return True
-        
-        # Then try fuzzy similarity if SequenceMatcher available
-        if SequenceMatcher:
-            for synonym in synonyms:
-                ratio = SequenceMatcher(None, text_lower, synonym.lower()).ratio()
-                if ratio >= threshold:
-                    return True
-        
-        # Fallback: token overlap
-        text_tokens = set(text_lower.split())
-        for synonym in synonyms:
-            synonym_tokens = set(synonym.lower().split())
-            if len(text_tokens & synonym_tokens) >= 2:  # At least 2 common words
-                return True
-        
-        return False
+        return _fuzzy_match_cached(text.lower(), tuple(synonyms), threshold)
+    
+    def _fuzzy_match_keys(self, keys, synonyms: List[str], threshold: float = 0.75) -> Tuple[bool, ...]:
+        """Per-key `_fuzzy_match` results for a collection of field names."""
+        return _fuzzy_match_keys(tuple(keys), tuple(synonyms), threshold)
+    
+    def _has_true_field(self, fields: Dict[str, Any], synonyms: List[str]) -> bool:
+        """Check if any field whose name matches the synonyms is exactly True."""
+        true_keys = [key for key, value in fields.items() if value is True]
+        return any(self._fuzzy_match_keys(true_keys, synonyms))
     
-    def _check_certificate_presence(self, blocks: List[Dict], certificate_synonyms: List[str], 
-                                   block_type: str = None) -> tuple:
+    def _check_certificate_presence(self, blocks: List[Dict], evidence_lower: List[str],
+                                    certificate_synonyms: List[str]) -> tuple:
         """
         Check if certificate is present using fuzzy matching on evidence snippets.
+        `blocks` are the blocks of the type expected to carry the certificate and
+        `evidence_lower` their lowercased evidence snippets.
         Returns (found: bool, evidence_snippet: str)
+        
+        Phase 1 only tries exact substring matches across every block; the
+        fuzzy scan below runs only when none of them hits.
         """
-        for block in blocks:
-            if block_type and block.get("block_type") != block_type:
-                continue
-            
+        table = _synonym_table(tuple(certificate_synonyms))
+        for block, block_evidence_lower in zip(blocks, evidence_lower):
+            extracted_data = block.get("extracted_data", {})
+            evidence_snippet = block.get("evidence_snippet") or ""
+            for key, value in extracted_data.items():
+                if (isinstance(key, str) and key and _is_present_value(value)
+                        and _substring_match(key.lower(), table)):
+                    return True, evidence_snippet or f"Found in {key}"
+            if block_evidence_lower and _substring_match(block_evidence_lower, table):
+                return True, evidence_snippet
+        
+        # Phase 2: fuzzy matching
+        for block, block_evidence_lower in zip(blocks, evidence_lower):
             extracted_data = block.get("extracted_data", {})
             evidence_snippet = block.get("evidence_snippet") or ""
             
+            # Score every field name against the synonyms in one batch
+            keys = list(extracted_data.keys())
+            key_matches = self._fuzzy_match_keys(keys, certificate_synonyms)
+            
             # Check in extracted_data boolean fields
-            for key, value in extracted_data.items():
-                if isinstance(value, bool) and value is True:
-                    if self._fuzzy_match(key, certificate_synonyms):
-                        return True, evidence_snippet or f"Found in {key}"
+            for key, matched in zip(keys, key_matches):
+                if matched and extracted_data[key] is True:
+                    return True, evidence_snippet or f"Found in {key}"
             
             # Check in evidence snippet text
-            if evidence_snippet and self._fuzzy_match(evidence_snippet, certificate_synonyms):
+            if block_evidence_lower and _fuzzy_match_cached(block_evidence_lower, tuple(certificate_synonyms), 0.75):
                 return True, evidence_snippet
             
             # Check field names
-            for key in extracted_data.keys():
-                if self._fuzzy_match(key, certificate_synonyms):
-                    value = extracted_data[key]
-                    if value is True or (isinstance(value, str) and value.lower() not in ["none", "null", "n/a"]):
-                        return True, evidence_snippet or f"Found in {key}"
+            for key, matched in zip(keys, key_matches):
+                if matched and _is_present_value(extracted_data[key]):
+                    return True, evidence_snippet or f"Found in {key}"
         
         return False, ""
     
-    def _check_aicte_compliance(self, blocks: List[Dict], data: Dict, mode: str) -> List[Dict[str, Any]]:
+    def _check_aicte_compliance(self, index: "_BlockIndex", data: Dict, mode: str) -> List[Dict[str, Any]]:
         """AICTE-specific compliance checks with fuzzy matching"""
         flags = []
+        blocks_by_type = index.blocks
+        safety_blocks = blocks_by_type.get("safety_compliance_information", [])
+        safety_evidence = index.evidence_lower.get("safety_compliance_information", [])
         
         # 1. Fire NOC validity (fuzzy matching)
-        fire_noc_synonyms = [
-            "Fire NOC", "Fire Safety NOC", "Fire Safety Certificate", 
-            "Fire NOC certificate", "Fire clearance", "Fire safety clearance"
-        ]
-        fire_found, fire_evidence = self._check_certificate_presence(blocks, fire_noc_synonyms, 
-                                                                      "safety_compliance_information")
+        fire_found, fire_evidence = self._check_certificate_presence(safety_blocks, safety_evidence, FIRE_NOC_SYNONYMS)
         
         # Also check in aggregated data
         if not fire_found:
-            for key in data.keys():
-                if self._fuzzy_match(key, fire_noc_synonyms):
-                    if data.get(key) is True:
-                        fire_found = True
-                        break
+            if self._has_true_field(data, FIRE_NOC_SYNONYMS):
+                fire_found = True
         
         if not fire_found:
-            flags.append({
-                "severity": "high",
-                "title": "Missing or Invalid Fire NOC",
-                "reason": "Fire NOC certificate is missing or not valid for current year",
-                "recommendation": "Obtain valid Fire NOC certificate for current year"
-            })
+            flags.append(dict(_FLAG_FIRE_NOC_MISSING))
         
         # 2. Building Stability Certificate (fuzzy matching)
-        building_synonyms = [
-            "Building Structural Safety Certificate", "Building Stability Certificate",
-            "Structural Safety Certificate", "Building Safety Certificate", "Structural Certificate"
-        ]
-        building_found, building_evidence = self._check_certificate_presence(blocks, building_synonyms,
-                                                                            "safety_compliance_information")
+        building_found, building_evidence = self._check_certificate_presence(safety_blocks, safety_evidence, BUILDING_SYNONYMS)
         
         if not building_found:
-            for key in data.keys():
-                if self._fuzzy_match(key, building_synonyms):
-                    if data.get(key) is True:
-                        building_found = True
-                        break
+            if self._has_true_field(data, BUILDING_SYNONYMS):
+                building_found = True
         
         if not building_found:
-            flags.append({
-                "severity": "high",
-                "title": "Missing Building Stability Certificate",
-                "reason": "Building Stability Certificate is missing",
-                "recommendation": "Submit Building Stability Certificate"
-            })
+            flags.append(dict(_FLAG_BUILDING_CERT_MISSING))
         
         # 3. Sanitary Certificate (fuzzy matching) - Only flag if mentioned AND expired
-        sanitary_synonyms = [
-            "Sanitary Certificate", "Environmental Clearance", 
-            "Sanitary Certificate or Environmental Clearance", "Environmental Certificate"
-        ]
-        sanitary_found, sanitary_evidence = self._check_certificate_presence(blocks, sanitary_synonyms,
-                                                                             "safety_compliance_information")
+        sanitary_found, sanitary_evidence = self._check_certificate_presence(safety_blocks, safety_evidence, SANITARY_SYNONYMS)
         
         if not sanitary_found:
-            for key in data.keys():
-                if self._fuzzy_match(key, sanitary_synonyms):
-                    if data.get(key) is True:
-                        sanitary_found = True
-                        break
+            if self._has_true_field(data, SANITARY_SYNONYMS):
+                sanitary_found = True
         
         # Check if sanitary certificate is mentioned in text
         sanitary_mentioned = False
-        for block in blocks:
-            if block.get("block_type") == "safety_compliance_information":
-                extracted_data = block.get("extracted_data", {})
-                evidence_snippet = block.get("evidence_snippet", "")
-                text = (evidence_snippet + " " + str(extracted_data)).lower()
-                if "sanitary" in text or "environmental clearance" in text:
-                    sanitary_mentioned = True
-                    # Check if expired (if date information available)
-                    # For now, only flag if mentioned AND we can determine it's expired
-                    # Since we don't have expiry date parsing, we'll only flag if explicitly mentioned as expired
-                    if "expired" in text or "invalid" in text or "not valid" in text:
-                        flags.append({
-                            "severity": "low",  # Sanitary certificate missing → LOW severity
-                            "title": "Sanitary Certificate Expired",
-                            "reason": "Sanitary Certificate or Environmental Clearance is expired or invalid",
-                            "recommendation": "Renew Sanitary Certificate"
-                        })
-                    break
+        for text in index.corpora.get("safety_compliance_information", []):
+            if "sanitary" in text or "environmental clearance" in text:
+                sanitary_mentioned = True
+                # Check if expired (if date information available)
+                # For now, only flag if mentioned AND we can determine it's expired
+                # Since we don't have expiry date parsing, we'll only flag if explicitly mentioned as expired
+                if "expired" in text or "invalid" in text or "not valid" in text:
+                    flags.append(dict(_FLAG_SANITARY_EXPIRED))
+                break
         
         # Only flag as missing if it was mentioned but not found (not mandatory for all institutions)
         # Do NOT auto-flag if not mentioned at all
         
         # 4. Mandatory committees (ICC, SC/ST, Anti-ragging) - fuzzy matching
-        committees_block = next((b for b in blocks if b.get("block_type") == "mandatory_committees_information"), None)
+        committees_block = blocks_by_type.get("mandatory_committees_information", [None])[0]
         if committees_block:
             committees_data = committees_block.get("extracted_data", {})
-            evidence_snippet = committees_block.get("evidence_snippet", "")
+            evidence_lower = index.evidence_lower["mandatory_committees_information"][0]
             missing_committees = []
             
             # ICC committee synonyms
-            icc_synonyms = ["ICC", "Internal Complaints Committee", "Internal Complaint Committee", 
-                          "ICC Committee", "Internal Complaints"]
             icc_found = False
-            for key in committees_data.keys():
-                if self._fuzzy_match(key, icc_synonyms):
-                    if committees_data.get(key) is True:
-                        icc_found = True
-                        break
-            if evidence_snippet and self._fuzzy_match(evidence_snippet, icc_synonyms):
+            if self._has_true_field(committees_data, ICC_SYNONYMS):
+                icc_found = True
+            if evidence_lower and _fuzzy_match_cached(evidence_lower, ICC_SYNONYMS, 0.75):
                 icc_found = True
             if not icc_found:
                 missing_committees.append("ICC (Internal Complaints Committee)")
             
             # Anti-ragging committee synonyms
-            anti_ragging_synonyms = ["Anti-Ragging Committee", "Anti Ragging Committee", 
-                                    "Anti-Ragging", "Anti Ragging", "Ragging Prevention Committee"]
             anti_ragging_found = False
-            for key in committees_data.keys():
-                if self._fuzzy_match(key, anti_ragging_synonyms):
-                    if committees_data.get(key) is True:
-                        anti_ragging_found = True
-                        break
-            if evidence_snippet and self._fuzzy_match(evidence_snippet, anti_ragging_synonyms):
+            if self._has_true_field(committees_data, ANTI_RAGGING_SYNONYMS):
+                anti_ragging_found = True
+            if evidence_lower and _fuzzy_match_cached(evidence_lower, ANTI_RAGGING_SYNONYMS, 0.75):
                 anti_ragging_found = True
             if not anti_ragging_found:
                 missing_committees.append("Anti-Ragging Committee")
             
             if missing_committees:
-                flags.append({
-                    "severity": "high",
-                    "title": "Missing Mandatory Committees",
-                    "reason": f"Required committees not found: {', '.join(missing_committees)}",
-                    "recommendation": "Establish and document all mandatory committees"
-                })
+                flag = dict(_FLAG_COMMITTEES_MISSING)
+                flag["reason"] = flag["reason"].format(", ".join(missing_committees))
+                flags.append(flag)
         
         # 5. Approved faculty appointment letters (check in faculty block)
-        faculty_block = next((b for b in blocks if b.get("block_type") == "faculty_information"), None)
+        faculty_block = blocks_by_type.get("faculty_information", [None])[0]
         if faculty_block:
             faculty_data = faculty_block.get("extracted_data", {})
             total_faculty = parse_numeric(faculty_data.get("total_faculty")) or parse_numeric(faculty_data.get("faculty_count"))
@@ -257,7 +617,7 @@ class ComplianceService:
                 pass  # Placeholder - would need more detailed extraction
         
         # 6. Land ownership / Lease documents (check in infrastructure block)
-        infra_block = next((b for b in blocks if b.get("block_type") == "infrastructure_information"), None)
+        infra_block = blocks_by_type.get("infrastructure_information", [None])[0]
         if infra_block:
             infra_data = infra_block.get("extracted_data", {})
             # Check for land ownership/lease mention
@@ -269,12 +629,13 @@ class ComplianceService:
         
         return flags
     
-    def _check_ugc_compliance(self, blocks: List[Dict], data: Dict, mode: str) -> List[Dict[str, Any]]:
+    def _check_ugc_compliance(self, index: "_BlockIndex", data: Dict, mode: str) -> List[Dict[str, Any]]:
         """UGC-specific compliance checks"""
         flags = []
+        blocks_by_type = index.blocks
         
         # 1. Governance bodies (BoG, AC, FC, IQAC)
-        governance_block = next((b for b in blocks if b.get("block_type") == "academic_governance_and_bodies"), None)
+        governance_block = blocks_by_type.get("academic_governance_and_bodies", [None])[0]
         if governance_block:
             gov_data = governance_block.get("extracted_data", {})
             missing_bodies = []
@@ -287,61 +648,38 @@ class ComplianceService:
                 missing_bodies.append("Finance Committee (FC)")
             
             if missing_bodies:
-                flags.append({
-                    "severity": "high",
-                    "title": "Missing Governance Bodies",
-                    "reason": f"Required governance bodies not found: {', '.join(missing_bodies)}",
-                    "recommendation": "Establish and document all required governance bodies"
-                })
+                flag = dict(_FLAG_GOVERNANCE_MISSING)
+                flag["reason"] = flag["reason"].format(", ".join(missing_bodies))
+                flags.append(flag)
         
         # Check IQAC separately
-        iqac_block = next((b for b in blocks if b.get("block_type") == "iqac_quality_assurance"), None)
+        iqac_block = blocks_by_type.get("iqac_quality_assurance", [None])[0]
         if iqac_block:
             iqac_data = iqac_block.get("extracted_data", {})
             if not iqac_data.get("iqac_established"):
-                flags.append({
-                    "severity": "high",
-                    "title": "IQAC Not Established",
-                    "reason": "Internal Quality Assurance Cell (IQAC) is not established",
-                    "recommendation": "Establish IQAC as per UGC guidelines"
-                })
+                flags.append(dict(_FLAG_IQAC_MISSING))
         
         # 2. UGC Regulations 2018 compliance
-        compliance_block = next((b for b in blocks if b.get("block_type") == "regulatory_compliance"), None)
+        compliance_block = blocks_by_type.get("regulatory_compliance", [None])[0]
         if compliance_block:
             compliance_data = compliance_block.get("extracted_data", {})
             if not compliance_data.get("ugc_regulations_2018_compliance"):
-                flags.append({
-                    "severity": "high",
-                    "title": "UGC Regulations 2018 Non-Compliance",
-                    "reason": "UGC Regulations 2018 compliance not confirmed",
-                    "recommendation": "Ensure full compliance with UGC Regulations 2018"
-                })
+                flags.append(dict(_FLAG_UGC_REGULATIONS))
         
         # 3. Financial viability (check in financial_information block)
-        financial_block = next((b for b in blocks if b.get("block_type") == "financial_information"), None)
+        financial_block = blocks_by_type.get("financial_information", [None])[0]
         if financial_block:
             financial_data = financial_block.get("extracted_data", {})
             annual_budget = parse_numeric(financial_data.get("annual_budget"))
             if annual_budget is None:
-                flags.append({
-                    "severity": "medium",
-                    "title": "Financial Information Missing",
-                    "reason": "Annual budget information is missing",
-                    "recommendation": "Submit complete financial information demonstrating viability"
-                })
+                flags.append(dict(_FLAG_FINANCIAL_MISSING))
         
         # 4. Statutory committees (check in regulatory_compliance block)
         if compliance_block:
             compliance_data = compliance_block.get("extracted_data", {})
             statutory_committees = compliance_data.get("statutory_committees")
             if not statutory_committees:
-                flags.append({
-                    "severity": "medium",
-                    "title": "Statutory Committees Missing",
-                    "reason": "Statutory committees information is missing",
-                    "recommendation": "Document all statutory committees"
-                })
+                flags.append(dict(_FLAG_STATUTORY_MISSING))
         
         # 5. Mandatory disclosures (check in regulatory_compliance block)
         if compliance_block:
@@ -353,3 +691,9 @@ class ComplianceService:
         # Placeholder - would need more detailed extraction
         
         return flags
+    
+    # Mode -> check, resolved once at class creation rather than on every check_compliance call
+    _MODE_CHECKS = {
+        "aicte": _check_aicte_compliance,
+        "ugc": _check_ugc_compliance,
+    }
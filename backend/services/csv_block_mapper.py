@@ -4,12 +4,24 @@ Directly maps CSV/Excel structured data to AICTE/UGC information blocks.
 Bypasses LLM extraction for structured data sources.
 """
 
+import codecs
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from collections import Counter
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Dict, FrozenSet, List, Any, NamedTuple, Optional, Tuple
 from pathlib import Path
 from utils.parse_numeric import parse_numeric
 from utils.parse_year import parse_year
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+try:
+    from openpyxl import load_workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -78,8 +90,64 @@ BLOCK_DETECTION_RULES = {
     }
 }
 
+# Freeze the rules at import: keyword and field membership become set operations
+for _rules in BLOCK_DETECTION_RULES.values():
+    _rules["keywords"] = frozenset(_rules["keywords"])
+    _rules["required_fields"] = frozenset(_rules["required_fields"])
+    _rules["optional_fields"] = frozenset(_rules["optional_fields"])
+del _rules
+
+# Rules for block types without detection rules (generic_data)
+NO_RULES = {"keywords": frozenset(), "required_fields": frozenset(), "optional_fields": frozenset()}
+
+# (field, its _num key, required?) per block type, to count filled fields in one pass
+CONFIDENCE_FIELDS: Dict[str, Tuple[Tuple[str, str, bool], ...]] = {
+    block_type: tuple(
+        (field, f"{field}_num", required)
+        for required, fields in ((True, rules["required_fields"]), (False, rules["optional_fields"]))
+        for field in fields
+    )
+    for block_type, rules in BLOCK_DETECTION_RULES.items()
+}
+
+# Every detection keyword once
+DETECTION_KEYWORDS: FrozenSet[str] = frozenset().union(
+    *(rules["keywords"] for rules in BLOCK_DETECTION_RULES.values())
+)
+
+
+def _build_substring_index() -> Dict[str, FrozenSet[str]]:
+    """Map every substring of every detection keyword (including "") to the keywords containing it."""
+    index: Dict[str, set] = {}
+    for keyword in DETECTION_KEYWORDS:
+        for start in range(len(keyword) + 1):
+            for end in range(start, len(keyword) + 1):
+                index.setdefault(keyword[start:end], set()).add(keyword)
+    return {substring: frozenset(keywords) for substring, keywords in index.items()}
+
+
+KEYWORD_SUBSTRINGS = _build_substring_index()
+
+
+@lru_cache(maxsize=2048)
+def keywords_matching_column(col_lower: str) -> FrozenSet[str]:
+    """
+    Detection keywords that contain, or are contained in, a lowercased column name.
+    Keywords containing the name come from one KEYWORD_SUBSTRINGS lookup.
+    """
+    contained = frozenset(keyword for keyword in DETECTION_KEYWORDS if keyword in col_lower)
+    return contained | KEYWORD_SUBSTRINGS.get(col_lower, frozenset())
+
+
+class ColumnNames(NamedTuple):
+    """A column label with its lowercased and normalized names, computed once by prepare_columns."""
+    label: Any
+    lower: str
+    normalized: str
+    num_key: str
 
-def detect_block_type_from_columns(columns: List[str]) -> Optional[str]:
+
+def detect_block_type_from_columns(columns: List[ColumnNames]) -> Optional[str]:
     """
     Detect block type based on column names.
     Returns the block type with the highest match score.
@@ -87,75 +155,92 @@ def detect_block_type_from_columns(columns: List[str]) -> Optional[str]:
     if not columns:
         return None
     
-    columns_lower = [str(c).lower().strip() for c in columns]
-    best_match = None
-    best_score = 0
+    # Each keyword scores once per block type that lists it, however many columns match it
+    matched_keywords = set()
+    for col in columns:
+        matched_keywords |= keywords_matching_column(col.lower)
     
-    for block_type, rules in BLOCK_DETECTION_RULES.items():
-        keywords = rules["keywords"]
-        score = 0
-        
-        for keyword in keywords:
-            for col in columns_lower:
-                if keyword in col or col in keyword:
-                    score += 1
-                    break
-        
-        if score > best_score:
-            best_score = score
-            best_match = block_type
+    # Ties go to the block type listed first in BLOCK_DETECTION_RULES
+    scores = {
+        block_type: len(rules["keywords"] & matched_keywords) for block_type, rules in BLOCK_DETECTION_RULES.items()
+    }
+    best_match = max(scores, key=scores.__getitem__)
     
     # Require at least 1 keyword match (more lenient)
-    if best_score >= 1:
+    if scores[best_match] >= 1:
         return best_match
     
     return None
 
 
+# Rows per chunk when streaming CSV files
+CSV_CHUNK_ROWS = 100_000
+
+# Excel files streamed row by row with openpyxl; others (.xls) go through pandas
+STREAMED_EXCEL_SUFFIXES = (".xlsx", ".xlsm")
+
+# Cell strings pd.read_excel reads as missing: pandas' default NA values plus Excel error values
+EXCEL_NA_VALUES = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    "#DIV/0!", "#NAME?", "#NULL!", "#NUM!", "#REF!", "#VALUE!",
+})
+
+# Bytes read from the start of a CSV to pick its encoding
+ENCODING_SNIFF_BYTES = 64 * 1024
+
+# Common column name mappings to schema field names
+COLUMN_NAME_MAPPINGS = {
+    "faculty": "faculty_count",
+    "total faculty": "faculty_count",
+    "no of faculty": "faculty_count",
+    "teaching staff": "faculty_count",
+    "students": "total_students",
+    "total students": "total_students",
+    "student count": "total_students",
+    "enrollment": "total_students",
+    "area": "built_up_area",
+    "built up area": "built_up_area",
+    "total area": "built_up_area",
+    "classroom": "classrooms",
+    "no of classrooms": "classrooms",
+    "classroom count": "classrooms",
+    "labs": "total_labs",
+    "laboratory": "total_labs",
+    "lab count": "total_labs",
+    "placed": "students_placed",
+    "students placed": "students_placed",
+    "eligible": "students_eligible",
+    "students eligible": "students_eligible",
+    "avg salary": "average_package",
+    "average salary": "average_package",
+    "highest salary": "highest_package",
+    "max salary": "highest_package",
+    "publication": "publications",
+    "publication count": "publications",
+    "patent": "patents",
+    "patent count": "patents",
+    "academic year": "academic_year",
+    "year": "academic_year",
+}
+
+
 def normalize_column_name(col: str) -> str:
     """
     Normalize column name to match AICTE/UGC schema field names.
     """
-    col_lower = str(col).lower().strip()
-    
-    # Common mappings
-    mappings = {
-        "faculty": "faculty_count",
-        "total faculty": "faculty_count",
-        "no of faculty": "faculty_count",
-        "teaching staff": "faculty_count",
-        "students": "total_students",
-        "total students": "total_students",
-        "student count": "total_students",
-        "enrollment": "total_students",
-        "area": "built_up_area",
-        "built up area": "built_up_area",
-        "total area": "built_up_area",
-        "classroom": "classrooms",
-        "no of classrooms": "classrooms",
-        "classroom count": "classrooms",
-        "labs": "total_labs",
-        "laboratory": "total_labs",
-        "lab count": "total_labs",
-        "placed": "students_placed",
-        "students placed": "students_placed",
-        "eligible": "students_eligible",
-        "students eligible": "students_eligible",
-        "avg salary": "average_package",
-        "average salary": "average_package",
-        "highest salary": "highest_package",
-        "max salary": "highest_package",
-        "publication": "publications",
-        "publication count": "publications",
-        "patent": "patents",
-        "patent count": "patents",
-        "academic year": "academic_year",
-        "year": "academic_year",
-    }
-    
+    return normalize_lowered_column_name(str(col).lower().strip())
+
+
+@lru_cache(maxsize=2048)
+def normalize_lowered_column_name(col_lower: str) -> str:
+    """
+    normalize_column_name for an already lowercased and stripped name.
+    Cached: the same headers are normalized for every file and sheet.
+    """
     # Direct mapping
-    if col_lower in mappings:
-        return mappings[col_lower]
+    if col_lower in COLUMN_NAME_MAPPINGS:
+        return COLUMN_NAME_MAPPINGS[col_lower]
     
     # Replace spaces and special chars with underscores
     normalized = col_lower.replace(" ", "_").replace("-", "_").replace(".", "_")
@@ -163,47 +248,137 @@ def normalize_column_name(col: str) -> str:
     return normalized
 
 
+def prepare_columns(columns) -> List[ColumnNames]:
+    """
+    Lowercase and normalize every column label once, for block detection,
+    the year-column scan and row mapping alike.
+    """
+    prepared = []
+    for col in columns:
+        col_lower = str(col).lower().strip()
+        normalized = normalize_lowered_column_name(col_lower)
+        prepared.append(ColumnNames(col, col_lower, normalized, normalized + "_num"))
+    return prepared
+
+
+def parse_cell(value: Any) -> Optional[Tuple[Any, Optional[float], Optional[int]]]:
+    """
+    Classify one CSV/Excel cell as (raw value, numeric value, year).
+    Returns None for empty cells and unsupported value types.
+    """
+    if value is None or (isinstance(value, str) and value.strip() == ""):
+        return None
+    
+    # Try to parse numeric values
+    if isinstance(value, (int, float)):
+        return value, float(value), None
+    if isinstance(value, str):
+        # Try parsing as number, then as a year; otherwise keep as string
+        parsed_num = parse_numeric(value)
+        if parsed_num is not None:
+            return value, parsed_num, None
+        return value, None, parse_year(value)
+    return None
+
+
+def parse_column(series: pd.Series) -> List[Optional[Tuple[Any, Optional[float], Optional[int]]]]:
+    """
+    Parse every cell of a column with parse_cell.
+    Numeric columns convert in one vectorized pass; other columns parse
+    each distinct value once.
+    """
+    values = series.to_numpy(dtype=object, na_value=None).tolist()
+    if is_numeric_dtype(series.dtype):
+        numbers = series.to_numpy(dtype=float, na_value=float("nan")).tolist()
+        return [None if value is None else (value, number, None) for value, number in zip(values, numbers)]
+    
+    parsed: Dict[Tuple[type, Any], Any] = {}
+    return [parse_cell_cached(value, parsed) for value in values]
+
+
+def parse_cell_cached(value: Any, parsed: Dict[Tuple[type, Any], Any]) -> Optional[Tuple[Any, Optional[float], Optional[int]]]:
+    """
+    parse_cell, memoized in parsed so repeated values are parsed once.
+    """
+    # Keyed by type too, so 1, 1.0 and True keep their own raw values
+    key = (type(value), value)
+    try:
+        return parsed[key]
+    except KeyError:
+        cell = parsed[key] = parse_cell(value)
+        return cell
+    except TypeError:
+        # Unhashable value
+        return parse_cell(value)
+
+
 def map_row_to_block_data(row: Dict[str, Any], block_type: str, columns: List[str]) -> Dict[str, Any]:
     """
     Map a CSV/Excel row to block data structure.
     """
+    return cells_to_block_data(
+        (((col.normalized, col.num_key), parse_cell(row.get(col.label))) for col in prepare_columns(columns)),
+        block_type
+    )
+
+
+# Fields cells_to_block_data derives from, or fills in across, columns of a row.
+# Keep in step with its block-specific mappings: columns named after these are merged row by row.
+ROW_YEAR_FIELDS = ["academic_year", "year", "last_updated_year"]
+ROW_DERIVED_FIELDS = {
+    "faculty_information": ["faculty_count", "faculty", "total_faculty", "teaching_staff"],
+    "student_enrollment_information": ["total_students", "students", "student_count", "enrollment",
+                                       "total_enrollment", "male_students", "male", "female_students", "female"],
+    "infrastructure_information": ["built_up_area", "built_up_area_sqm", "area", "total_area", "campus_area",
+                                   "building_area", "classrooms", "classroom", "classroom_count", "no_of_classrooms"],
+    "placement_information": ["students_placed", "placed", "placement_count", "students_eligible", "eligible",
+                              "eligible_students", "placement_rate"],
+    "lab_information": ["total_labs", "labs", "lab_count", "laboratory"],
+}
+
+
+def _derived_keys(fields: List[str]) -> FrozenSet[str]:
+    """Raw and _num block data keys of fields."""
+    return frozenset(key for field in fields for key in (field, f"{field}_num"))
+
+
+# Block data keys read or written by row derivation, per block type
+ROW_YEAR_KEYS = _derived_keys(ROW_YEAR_FIELDS)
+ROW_DERIVED_KEYS = {
+    block_type: _derived_keys(ROW_YEAR_FIELDS + fields) for block_type, fields in ROW_DERIVED_FIELDS.items()
+}
+
+
+@lru_cache(maxsize=2048)
+def is_year_key(key: str) -> bool:
+    """Whether a block data key names a year, session or academic field."""
+    key = key.lower()
+    return any(term in key for term in ['year', 'session', 'academic'])
+
+
+def cells_to_block_data(cells, block_type: str, scan_years: bool = True) -> Dict[str, Any]:
+    """
+    Build block data from one row's ((normalized column, its _num key), parse_cell result) pairs.
+    scan_years=False skips the academic_year scan, for columns none of which is_year_key.
+    """
     block_data = {}
-    rules = BLOCK_DETECTION_RULES.get(block_type, {})
     
-    # Normalize column names and map values
-    for col in columns:
-        normalized_col = normalize_column_name(col)
-        value = row.get(col)
-        
-        if value is None or (isinstance(value, str) and value.strip() == ""):
+    for (normalized_col, num_key), cell in cells:
+        if cell is None:
             continue
-        
-        # Try to parse numeric values
-        if isinstance(value, (int, float)):
-            block_data[normalized_col] = value
-            block_data[f"{normalized_col}_num"] = float(value)
-        elif isinstance(value, str):
-            # Try parsing as number
-            parsed_num = parse_numeric(value)
-            if parsed_num is not None:
-                block_data[normalized_col] = value  # Keep raw value
-                block_data[f"{normalized_col}_num"] = parsed_num
-            else:
-                # Check if it's a year
-                parsed_year = parse_year(value)
-                if parsed_year:
-                    block_data[normalized_col] = value
-                    block_data["last_updated_year"] = parsed_year
-                else:
-                    # Keep as string
-                    block_data[normalized_col] = value
+        value, parsed_num, parsed_year = cell
+        block_data[normalized_col] = value  # Keep raw value
+        if parsed_num is not None:
+            block_data[num_key] = parsed_num
+        elif parsed_year:
+            block_data["last_updated_year"] = parsed_year
     
     # Extract and set academic_year if found in any field
-    if "academic_year" not in block_data:
+    if scan_years and "academic_year" not in block_data:
         for key, value in block_data.items():
             if value and isinstance(value, str):
                 # Check if field name suggests it's a year
-                if any(term in key.lower() for term in ['year', 'session', 'academic']):
+                if is_year_key(key):
                     parsed_year = parse_year(str(value))
                     if parsed_year:
                         # Format as academic year (e.g., 2023-24)
@@ -215,6 +390,10 @@ def map_row_to_block_data(row: Dict[str, Any], block_type: str, columns: List[st
                         block_data["year"] = parsed_year
                         break
     
+    if block_type not in ROW_DERIVED_FIELDS:
+        # No block-specific mappings (e.g. generic_data)
+        return block_data
+    
     # Block-specific mappings
     if block_type == "faculty_information":
         # Map common variations
@@ -301,48 +480,196 @@ def map_row_to_block_data(row: Dict[str, Any], block_type: str, columns: List[st
     return block_data
 
 
-def map_csv_file(file_path: str, mode: str = "aicte") -> List[Dict[str, Any]]:
+def aggregate_rows(df: pd.DataFrame, columns: List[ColumnNames], block_type: str,
+                   aggregated_data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Map a CSV file to information blocks.
-    
-    Returns:
-        List of block dictionaries: [
-            {
-                "block_type": "...",
-                "data": {...},
-                "confidence": 0.95,
-                "source": "csv"
-            }
-        ]
+    Merge the block data of every row into aggregated_data.
+    Plain numeric columns are reduced column-wise; the other columns are
+    parsed once up front and merged row by row, skipping the columns and
+    rows in which they are all missing.
     """
-    blocks = []
+    plain = plain_numeric_columns(df, columns, block_type)
+    row_cols = [j for j in range(len(columns)) if j not in plain]
     
-    try:
-        # Read CSV with multiple encoding attempts
-        df = None
-        for encoding in ['utf-8', 'latin-1', 'cp1252']:
-            try:
-                df = pd.read_csv(file_path, encoding=encoding)
-                break
-            except:
-                continue
+    # Rows with no value in any row-merged column add nothing to the block data
+    row_numbers = None
+    if row_cols:
+        present = df[[columns[j].label for j in row_cols]].notna().to_numpy()
+        row_cols = [j for j, used in zip(row_cols, present.any(axis=0)) if used]
+        filled_rows = present.any(axis=1)
+        if not filled_rows.all():
+            row_numbers = np.flatnonzero(filled_rows).tolist()
+    filled = df if row_numbers is None else df.iloc[row_numbers]
+    
+    parsed_columns = {j: parse_column(filled[columns[j].label]) for j in row_cols}
+    new_key_rows: Dict[str, int] = {}
+    merge_rows(zip(*parsed_columns.values()), [columns[j] for j in row_cols], block_type,
+               aggregated_data, new_key_rows, row_numbers)
+    if not plain:
+        return aggregated_data
+    
+    # Reduce plain columns: (numbers, non-missing mask) per column index
+    plain_values = {}
+    new_plain_keys: Dict[str, int] = {}
+    for j in plain:
+        series = df[columns[j].label]
+        mask = series.notna().to_numpy()
+        values = series.to_numpy()
+        plain_values[j] = values, mask
+        if not mask.any():
+            continue
+        valid = values[mask]
+        col = columns[j]
+        for key, as_value in ((col.normalized, np.generic.item), (col.num_key, float)):
+            if key not in aggregated_data:
+                new_plain_keys[key] = int(mask.argmax())
+            aggregated_data[key] = reduce_numbers(aggregated_data.get(key), valid, key, as_value)
+    
+    if new_plain_keys:
+        # Restore first-seen key order: by first row, then by position in that row's block data
+        first_rows = {**new_key_rows, **new_plain_keys}
+        filled_positions = None if row_numbers is None else {row: i for i, row in enumerate(row_numbers)}
+        positions = {}
+        for row in sorted(set(first_rows.values())):
+            row_cells = [
+                (values[row].item(), float(values[row]), None) if mask[row] else None
+                for values, mask in (plain_values[j] for j in plain)
+            ]
+            cells = dict(zip(plain, row_cells))
+            position = row if filled_positions is None else filled_positions.get(row)
+            if position is not None:
+                cells.update((j, parsed_columns[j][position]) for j in row_cols)
+            row_data = cells_to_block_data(
+                (((col.normalized, col.num_key), cells.get(j)) for j, col in enumerate(columns)), block_type
+            )
+            positions.update((key, (row, i)) for i, key in enumerate(row_data) if first_rows.get(key) == row)
         
-        if df is None:
-            df = pd.read_csv(file_path, encoding='utf-8', errors='ignore')
+        new_keys = sorted(first_rows, key=positions.__getitem__)
+        ordered = {key: value for key, value in aggregated_data.items() if key not in first_rows}
+        ordered.update((key, aggregated_data[key]) for key in new_keys)
+        aggregated_data.clear()
+        aggregated_data.update(ordered)
+    
+    return aggregated_data
+
+
+def plain_numeric_columns(df: pd.DataFrame, columns: List[ColumnNames], block_type: str) -> List[int]:
+    """
+    Indexes of columns that can be reduced without building rows: numeric
+    numpy dtype, and block data keys that no other column and no row
+    derivation for block_type reads or writes.
+    """
+    derived = ROW_DERIVED_KEYS.get(block_type, ROW_YEAR_KEYS)
+    key_counts = Counter(key for col in columns for key in (col.normalized, col.num_key))
+    dtypes = [df[col.label].dtype for col in columns]
+    return [
+        j for j, col in enumerate(columns)
+        if isinstance(dtypes[j], np.dtype) and dtypes[j].kind in "iufb"
+        and key_counts[col.normalized] == 1 and key_counts[col.num_key] == 1
+        and col.normalized not in derived and col.num_key not in derived
+    ]
+
+
+def reduce_numbers(current: Any, numbers: np.ndarray, key: str, as_value) -> Any:
+    """
+    Fold a column's non-missing numbers into the current aggregated value,
+    with the same rules as merge_rows: the first value is kept unless it is
+    numeric; numeric values then take the max for count/total keys and the
+    latest value otherwise.
+    """
+    if current is None:
+        current = as_value(numbers[0])
+    elif not isinstance(current, (int, float)):
+        return current
+    
+    if "count" in key or "total" in key:
+        return max(current, as_value(numbers.max()))
+    return as_value(numbers[-1])
+
+
+def merge_rows(rows, columns: List[ColumnNames], block_type: str,
+               aggregated_data: Dict[str, Any], new_key_rows: Optional[Dict[str, int]] = None,
+               row_numbers: Optional[List[int]] = None) -> Dict[str, Any]:
+    """
+    Merge rows of parsed cells, aligned with columns, into aggregated_data.
+    Keys new to aggregated_data are recorded in new_key_rows with the number of their
+    first row: its entry in row_numbers when given, otherwise its position in rows.
+    """
+    column_keys = [(col.normalized, col.num_key) for col in columns]
+    # Only string values under year-like column names can set academic_year
+    scan_years = any(is_year_key(col.normalized) for col in columns)
+    numbered_rows = enumerate(rows) if row_numbers is None else zip(row_numbers, rows)
+    for row, row_cells in numbered_rows:
+        row_data = cells_to_block_data(zip(column_keys, row_cells), block_type, scan_years)
         
-        if df.empty:
+        # Merge row data into aggregated data (prefer non-null values)
+        for key, value in row_data.items():
+            if key not in aggregated_data:
+                aggregated_data[key] = value
+                if new_key_rows is not None:
+                    new_key_rows[key] = row
+                continue
+            current = aggregated_data[key]
+            if current is None:
+                aggregated_data[key] = value
+            elif isinstance(value, (int, float)) and isinstance(current, (int, float)):
+                # For numeric values, use sum or max depending on field
+                if "count" in key or "total" in key:
+                    if value > current:
+                        aggregated_data[key] = value
+                else:
+                    aggregated_data[key] = value
+    
+    return aggregated_data
+
+
+def first_valid_values(series: pd.Series, n: int) -> List[Any]:
+    """
+    First n non-missing values of a column.
+    Stops scanning once found instead of copying the column via dropna().
+    """
+    return list(islice((value for value in series if not pd.isna(value)), n))
+
+
+def sniff_csv_encoding(file_path: str) -> str:
+    """
+    Pick the CSV encoding from the head of the file: utf-8 if it decodes
+    as UTF-8, otherwise latin-1.
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(ENCODING_SNIFF_BYTES)
+    try:
+        # Incremental decode tolerates a multi-byte character cut at the boundary
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def aggregate_csv(file_path: str, encoding: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Detect the block type of a CSV file and aggregate its rows.
+    The file is read in chunks of CSV_CHUNK_ROWS rows, so memory is bounded
+    by one chunk; block type and year column come from the first chunk.
+    Returns (block_type, aggregated_data), or None for a file without rows.
+    """
+    reader = pd.read_csv(file_path, encoding=encoding, chunksize=CSV_CHUNK_ROWS)
+    with reader:
+        df = next(reader, None)
+        if df is None or df.empty:
             logger.warning(f"CSV file {file_path} is empty")
-            return blocks
+            return None
         
-        columns = list(df.columns)
-        logger.info(f"CSV columns: {columns}")
+        labels = list(df.columns)
+        logger.info(f"CSV columns: {labels}")
+        columns = prepare_columns(labels)
         
         # Detect block type from columns
         block_type = detect_block_type_from_columns(columns)
         
         if not block_type:
             # Fallback: Use generic_data block and extract all columns
-            logger.info(f"No specific block type detected, using generic_data for columns: {columns}")
+            logger.info(f"No specific block type detected, using generic_data for columns: {labels}")
             block_type = "generic_data"
         
         logger.info(f"Detected block type: {block_type} for CSV file")
@@ -350,13 +677,11 @@ def map_csv_file(file_path: str, mode: str = "aicte") -> List[Dict[str, Any]]:
         # Check if CSV has year-based structure (rows per year)
         year_column = None
         for col in columns:
-            col_lower = str(col).lower().strip()
-            if any(term in col_lower for term in ['year', 'academic_year', 'session', 'academic']):
+            if is_year_key(col.lower):
                 # Check if this column contains year values
                 try:
-                    sample_values = df[col].dropna().head(5).astype(str)
-                    if any(parse_year(str(v)) for v in sample_values):
-                        year_column = col
+                    if any(parse_year(str(v)) for v in first_valid_values(df[col.label], 5)):
+                        year_column = col.label
                         break
                 except (KeyError, AttributeError, TypeError):
                     # Column might not exist or have issues, skip it
@@ -364,10 +689,10 @@ def map_csv_file(file_path: str, mode: str = "aicte") -> List[Dict[str, Any]]:
         
         # If year column found, extract year from first row or use latest
         if year_column:
-            year_values = df[year_column].dropna()
-            if not year_values.empty:
+            year_values = first_valid_values(df[year_column], 1)
+            if year_values:
                 # Try to parse year from first non-null value
-                first_year_val = str(year_values.iloc[0])
+                first_year_val = str(year_values[0])
                 parsed_year = parse_year(first_year_val)
                 if parsed_year:
                     academic_year = f"{parsed_year}-{str(parsed_year + 1)[-2:]}"
@@ -379,42 +704,73 @@ def map_csv_file(file_path: str, mode: str = "aicte") -> List[Dict[str, Any]]:
         else:
             aggregated_data = {}
         
-        # Aggregate all rows into a single block
-        for idx, row in df.iterrows():
-            row_dict = row.to_dict()
-            row_data = map_row_to_block_data(row_dict, block_type, columns)
-            
-            # Merge row data into aggregated data (prefer non-null values)
-            for key, value in row_data.items():
-                if key not in aggregated_data or aggregated_data[key] is None:
-                    aggregated_data[key] = value
-                elif isinstance(value, (int, float)) and isinstance(aggregated_data[key], (int, float)):
-                    # For numeric values, use sum or max depending on field
-                    if "count" in key or "total" in key:
-                        aggregated_data[key] = max(aggregated_data[key], value)
-                    else:
-                        aggregated_data[key] = value
-        
-        # Calculate confidence based on data completeness
-        rules = BLOCK_DETECTION_RULES.get(block_type, {})
-        required_fields = rules.get("required_fields", [])
-        optional_fields = rules.get("optional_fields", [])
-        
-        filled_required = sum(1 for field in required_fields if field in aggregated_data or f"{field}_num" in aggregated_data)
-        filled_optional = sum(1 for field in optional_fields if field in aggregated_data or f"{field}_num" in aggregated_data)
+        # Aggregate all rows into a single block, one chunk at a time
+        aggregate_rows(df, columns, block_type, aggregated_data)
+        for chunk in reader:
+            aggregate_rows(chunk, columns, block_type, aggregated_data)
         
-        total_fields = len(required_fields) + len(optional_fields)
-        filled_fields = filled_required + filled_optional
+        return block_type, aggregated_data
+
+
+def _compute_confidence(block_type: str, aggregated_data: Dict[str, Any]) -> float:
+    """
+    Score a mapped block by how many of its rule fields were filled (0.85 to 0.98).
+    """
+    rules = BLOCK_DETECTION_RULES.get(block_type, NO_RULES)
+    required_fields, optional_fields = rules["required_fields"], rules["optional_fields"]
+    
+    filled_required = filled_optional = 0
+    for field, num_key, required in CONFIDENCE_FIELDS.get(block_type, ()):
+        if field in aggregated_data or num_key in aggregated_data:
+            if required:
+                filled_required += 1
+            else:
+                filled_optional += 1
+    
+    total_fields = len(required_fields) + len(optional_fields)
+    filled_fields = filled_required + filled_optional
+    
+    if total_fields > 0:
+        completeness = filled_fields / total_fields
+        confidence = 0.85 + (completeness * 0.13)
+    else:
+        confidence = 0.90
+    
+    # If required fields are present, boost confidence
+    if required_fields and filled_required == len(required_fields):
+        confidence = min(0.98, confidence + 0.05)
+    
+    return confidence
+
+
+def map_csv_file(file_path: str, mode: str = "aicte") -> List[Dict[str, Any]]:
+    """
+    Map a CSV file to information blocks.
+    
+    Returns:
+        List of block dictionaries: [
+            {
+                "block_type": "...",
+                "data": {...},
+                "confidence": 0.95,
+                "source": "csv"
+            }
+        ]
+    """
+    blocks = []
+    
+    try:
+        try:
+            mapped = aggregate_csv(file_path, sniff_csv_encoding(file_path))
+        except UnicodeDecodeError:
+            # Invalid UTF-8 past the sniffed head; latin-1 decodes any byte sequence
+            mapped = aggregate_csv(file_path, "latin-1")
         
-        if total_fields > 0:
-            completeness = filled_fields / total_fields
-            confidence = 0.85 + (completeness * 0.13)  # 0.85 to 0.98
-        else:
-            confidence = 0.90
+        if mapped is None:
+            return blocks
+        block_type, aggregated_data = mapped
         
-        # If required fields are present, boost confidence
-        if required_fields and filled_required == len(required_fields):
-            confidence = min(0.98, confidence + 0.05)
+        confidence = _compute_confidence(block_type, aggregated_data)
         
         blocks.append({
             "block_type": block_type,
@@ -434,6 +790,137 @@ def map_csv_file(file_path: str, mode: str = "aicte") -> List[Dict[str, Any]]:
     return blocks
 
 
+def excel_sheet_block_type(columns: List[ColumnNames], sheet_name: str) -> str:
+    """
+    Detect the block type of an Excel sheet, falling back to generic_data.
+    """
+    block_type = detect_block_type_from_columns(columns)
+    
+    if not block_type:
+        # Fallback: Use generic_data block for sheets without detected type
+        logger.info(f"No specific block type for sheet '{sheet_name}', using generic_data")
+        block_type = "generic_data"
+    
+    return block_type
+
+
+def excel_sheet_block(block_type: str, aggregated_data: Dict[str, Any], sheet_name: str,
+                      file_path: str) -> Dict[str, Any]:
+    """
+    Build the block dictionary for an aggregated Excel sheet.
+    """
+    confidence = _compute_confidence(block_type, aggregated_data)
+    
+    block = {
+        "block_type": block_type,
+        "data": aggregated_data,
+        "confidence": confidence,
+        "source": "excel",
+        "sheet": sheet_name,
+        "file_path": file_path
+    }
+    
+    logger.info(f"✅ Mapped Excel sheet '{sheet_name}' to {block_type} block (confidence: {confidence:.2f})")
+    return block
+
+
+def map_excel_sheet(df: pd.DataFrame, sheet_name: str, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Map one parsed Excel sheet to an information block.
+    Returns None for an empty sheet.
+    """
+    if df.empty:
+        return None
+    
+    columns = prepare_columns(df.columns)
+    block_type = excel_sheet_block_type(columns, sheet_name)
+    
+    # Aggregate rows from this sheet
+    aggregated_data = aggregate_rows(df, columns, block_type, {})
+    
+    return excel_sheet_block(block_type, aggregated_data, sheet_name, file_path)
+
+
+def worksheet_columns(header: Tuple[Any, ...]) -> List[Any]:
+    """
+    Column labels for a worksheet header row, named as pd.read_excel names
+    them: empty cells become "Unnamed: <i>", repeats get ".1", ".2", ...
+    """
+    columns = []
+    seen: Dict[Any, int] = {}
+    for i, label in enumerate(header):
+        if label is None:
+            label = f"Unnamed: {i}"
+        count = seen.get(label, 0)
+        seen[label] = count + 1
+        columns.append(f"{label}.{count}" if count else label)
+    return columns
+
+
+def map_worksheet(worksheet, sheet_name: str, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Map one read-only openpyxl worksheet to an information block.
+    Rows are streamed straight into the aggregate, so only the current row
+    is held in memory. Returns None for an empty sheet.
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    # Blank rows carry no data; a sheet with none but blank rows is empty
+    rows = (row for row in rows if row.count(None) < len(row))
+    first_row = next(rows, None)
+    if first_row is None:
+        return None
+    
+    columns = prepare_columns(worksheet_columns(header))
+    block_type = excel_sheet_block_type(columns, sheet_name)
+    
+    # Strings pandas would read as NaN parse as missing cells
+    parsed: Dict[Tuple[type, Any], Any] = {(str, value): None for value in EXCEL_NA_VALUES}
+    parsed_rows = (
+        tuple(parse_cell_cached(value, parsed) for value in row)
+        for row in chain((first_row,), rows)
+    )
+    aggregated_data = merge_rows(parsed_rows, columns, block_type, {})
+    
+    return excel_sheet_block(block_type, aggregated_data, sheet_name, file_path)
+
+
+def map_xlsx_file(file_path: str) -> List[Dict[str, Any]]:
+    """
+    Map an .xlsx file to information blocks by streaming each sheet with
+    openpyxl in read-only mode, without building DataFrames.
+    """
+    blocks = []
+    workbook = None
+    
+    try:
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        sheet_names = workbook.sheetnames
+        
+        logger.info(f"Excel file has {len(sheet_names)} sheets: {sheet_names}")
+        
+        for sheet_name in sheet_names:
+            try:
+                block = map_worksheet(workbook[sheet_name], sheet_name, file_path)
+                if block is not None:
+                    blocks.append(block)
+                
+            except Exception as e:
+                logger.warning(f"Error processing sheet '{sheet_name}': {e}")
+                continue
+        
+    except Exception as e:
+        logger.error(f"Error mapping Excel file {file_path}: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+    finally:
+        # Read-only workbooks keep the file open until closed
+        if workbook is not None:
+            workbook.close()
+    
+    return blocks
+
+
 def map_excel_file(file_path: str, mode: str = "aicte") -> List[Dict[str, Any]]:
     """
     Map an Excel file to information blocks.
@@ -442,6 +929,9 @@ def map_excel_file(file_path: str, mode: str = "aicte") -> List[Dict[str, Any]]:
     Returns:
         List of block dictionaries
     """
+    if OPENPYXL_AVAILABLE and Path(file_path).suffix.lower() in STREAMED_EXCEL_SUFFIXES:
+        return map_xlsx_file(file_path)
+    
     blocks = []
     excel_file = None
     
@@ -453,65 +943,10 @@ def map_excel_file(file_path: str, mode: str = "aicte") -> List[Dict[str, Any]]:
         
         for sheet_name in sheet_names:
             try:
-                df = pd.read_excel(excel_file, sheet_name=sheet_name)
-                
-                if df.empty:
-                    continue
-                
-                columns = list(df.columns)
-                block_type = detect_block_type_from_columns(columns)
-                
-                if not block_type:
-                    # Fallback: Use generic_data block for sheets without detected type
-                    logger.info(f"No specific block type for sheet '{sheet_name}', using generic_data")
-                    block_type = "generic_data"
-                
-                # Aggregate rows from this sheet
-                aggregated_data = {}
-                
-                for idx, row in df.iterrows():
-                    row_dict = row.to_dict()
-                    row_data = map_row_to_block_data(row_dict, block_type, columns)
-                    
-                    for key, value in row_data.items():
-                        if key not in aggregated_data or aggregated_data[key] is None:
-                            aggregated_data[key] = value
-                        elif isinstance(value, (int, float)) and isinstance(aggregated_data[key], (int, float)):
-                            if "count" in key or "total" in key:
-                                aggregated_data[key] = max(aggregated_data[key], value)
-                            else:
-                                aggregated_data[key] = value
-                
-                # Calculate confidence
-                rules = BLOCK_DETECTION_RULES.get(block_type, {})
-                required_fields = rules.get("required_fields", [])
-                optional_fields = rules.get("optional_fields", [])
-                
-                filled_required = sum(1 for field in required_fields if field in aggregated_data or f"{field}_num" in aggregated_data)
-                filled_optional = sum(1 for field in optional_fields if field in aggregated_data or f"{field}_num" in aggregated_data)
-                
-                total_fields = len(required_fields) + len(optional_fields)
-                filled_fields = filled_required + filled_optional
-                
-                if total_fields > 0:
-                    completeness = filled_fields / total_fields
-                    confidence = 0.85 + (completeness * 0.13)
-                else:
-                    confidence = 0.90
-                
-                if required_fields and filled_required == len(required_fields):
-                    confidence = min(0.98, confidence + 0.05)
-                
-                blocks.append({
-                    "block_type": block_type,
-                    "data": aggregated_data,
-                    "confidence": confidence,
-                    "source": "excel",
-                    "sheet": sheet_name,
-                    "file_path": file_path
-                })
-                
-                logger.info(f"✅ Mapped Excel sheet '{sheet_name}' to {block_type} block (confidence: {confidence:.2f})")
+                df = excel_file.parse(sheet_name)
+                block = map_excel_sheet(df, sheet_name, file_path)
+                if block is not None:
+                    blocks.append(block)
                 
             except Exception as e:
                 logger.warning(f"Error processing sheet '{sheet_name}': {e}")
@@ -4,22 +4,164 @@ Primary extraction engine - replaces Unstructured-IO
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple, Union
 from pathlib import Path
+import importlib
+import io
+import multiprocessing
 import os
 import json
+import threading
+
+from config.settings import settings
+from utils.parse_cache import cached_parse
+from utils.process_pool import get_process_pool, discard_process_pool
 
 logger = logging.getLogger(__name__)
 
 try:
     from docling.document_converter import DocumentConverter
-    from docling.datamodel.base_models import InputFormat
+    from docling.datamodel.base_models import DocumentStream, InputFormat
     from docling.datamodel.pipeline_options import PdfPipelineOptions
     DOCLING_AVAILABLE = True
 except ImportError:
     DOCLING_AVAILABLE = False
     logger.warning("Docling not installed. Please install with: pip install docling")
 
+# Loaded converters shared by every DoclingService, keyed by (do_ocr, do_table_structure)
+_CONVERTERS: Dict[Tuple[bool, bool], Any] = {}
+_CONVERTERS_LOCK = threading.Lock()
+
+
+def get_pdf_converter(do_ocr: bool = False, do_table_structure: bool = True):
+    """
+    Return the Docling PDF converter for these pipeline options, building it on first use.
+    Model loading takes seconds, so every service instance shares one converter per option set.
+    """
+    key = (do_ocr, do_table_structure)
+    with _CONVERTERS_LOCK:
+        converter = _CONVERTERS.get(key)
+        if converter is None:
+            pipeline_options = PdfPipelineOptions()
+            pipeline_options.do_ocr = do_ocr
+            pipeline_options.do_table_structure = do_table_structure
+            pipeline_options.table_structure_options.do_cell_matching = True
+            
+            converter = _CONVERTERS[key] = DocumentConverter(
+                format=InputFormat.PDF,
+                pipeline_options=pipeline_options
+            )
+    return converter
+
+
+# Seconds a Docling conversion may take before the PyPDF fallback is used
+DOCLING_TIMEOUT_SECONDS = 15
+
+# Shared conversion threads. Also caps concurrent conversions: a timed-out one keeps its thread until Docling returns
+_DOCLING_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="docling")
+
+# Single background writer for the storage/debug dumps, so disk I/O overlaps the next parse
+_DEBUG_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="docling-debug")
+
+
+def _write_debug_files(debug_dir: Path, files: Dict[str, str], label: str) -> None:
+    """Write debug dumps (file name -> content) into debug_dir; runs on the debug writer thread."""
+    try:
+        debug_dir.mkdir(parents=True, exist_ok=True)
+        for name, content in files.items():
+            with open(debug_dir / name, "w", encoding="utf-8") as f:
+                f.write(content)
+    except Exception as debug_err:
+        logger.warning(f"Failed to write {label} debug files: {debug_err}")
+
+
+def queue_debug_files(files: Dict[str, str], label: str) -> None:
+    """Hand debug dumps to the background writer, unless DOCLING_DEBUG_FILES is off."""
+    if settings.DOCLING_DEBUG_FILES:
+        # Resolve now: the working directory may change before the write runs
+        debug_dir = (Path("storage") / "debug").absolute()
+        _DEBUG_WRITER.submit(_write_debug_files, debug_dir, files, label)
+
+
+# PDFs with fewer pages are extracted in-process. Measured per extra worker on the warm pool:
+# ~0.4 ms dispatch plus 2-7 ms to re-open the PDF, against 2.5 ms (image-heavy) to 70 ms
+# (text-heavy) of extraction per page, so splitting pays off from about 8 pages
+PARALLEL_PAGE_THRESHOLD = 8
+
+
+def read_pdf_bytes(filepath: str) -> io.BytesIO:
+    """
+    Read a whole PDF with one sequential read.
+    pypdf seeks around the file for xref entries and objects; from memory those are plain slices.
+    """
+    return io.BytesIO(Path(filepath).read_bytes())
+
+
+def looks_like_pdf(source: Union[str, io.BytesIO]) -> bool:
+    """
+    Cheap structural check: a %PDF- header near the start and an %%EOF marker near the end.
+    source is a path or a PDF already read into memory.
+    """
+    if isinstance(source, io.BytesIO):
+        with source.getbuffer() as data:
+            return b"%PDF-" in bytes(data[:1024]) and b"%%EOF" in bytes(data[-1024:])
+    with open(source, "rb") as f:
+        if b"%PDF-" not in f.read(1024):
+            return False
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - 1024))
+        return b"%%EOF" in f.read()
+
+
+def _extract_page_range(task) -> List[Optional[str]]:
+    """Extract the text of pages [start, stop) in a worker process."""
+    pdf_module, filepath, start, stop = task
+    reader_module = importlib.import_module(pdf_module)
+    pages = reader_module.PdfReader(read_pdf_bytes(filepath)).pages
+    return [pages[page_num].extract_text() for page_num in range(start, stop)]
+
+
+def extract_page_texts(reader, filepath: str, pdf_module: str = "pypdf") -> List[Optional[str]]:
+    """
+    Extract every page's text in page order.
+    Larger PDFs are split into one contiguous page range per CPU, each read by a worker of the
+    shared process pool. Inside a worker process (parse_documents batches) pages are extracted
+    serially: a nested pool per worker would start cpu_count² processes.
+    """
+    num_pages = len(reader.pages)
+    workers = min(os.cpu_count() or 1, num_pages)
+    in_worker = multiprocessing.parent_process() is not None
+    if num_pages < PARALLEL_PAGE_THRESHOLD or workers < 2 or in_worker:
+        return [page.extract_text() for page in reader.pages]
+    
+    step = -(-num_pages // workers)
+    tasks = [(pdf_module, filepath, start, min(start + step, num_pages)) for start in range(0, num_pages, step)]
+    pool = get_process_pool()
+    try:
+        return [text for texts in pool.map(_extract_page_range, tasks) for text in texts]
+    except (BrokenProcessPool, OSError) as pool_err:
+        discard_process_pool(pool)
+        logger.warning(f"Parallel page extraction failed ({pool_err}), extracting pages serially")
+        return [page.extract_text() for page in reader.pages]
+
+@dataclass(slots=True)
+class _Section:
+    """Heading-delimited run of document text, collected while walking Docling items"""
+    title: str
+    level: int
+    page: int
+    content: List[str] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"title": self.title, "level": self.level, "page": self.page, "content": self.content}
+    
+    def to_chunk(self) -> Dict[str, Any]:
+        return {"title": self.title, "level": self.level, "page": self.page, "text": "\n".join(self.content)}
+
+
 class DoclingService:
     """Docling-based document parsing service with fallback"""
     
@@ -31,16 +173,8 @@ class DoclingService:
             self.converter = None
         else:
             try:
-                # Initialize DocumentConverter with optimized settings
-                pipeline_options = PdfPipelineOptions()
-                pipeline_options.do_ocr = False  # We'll use PaddleOCR as fallback
-                pipeline_options.do_table_structure = True
-                pipeline_options.table_structure_options.do_cell_matching = True
-                
-                self.converter = DocumentConverter(
-                    format=InputFormat.PDF,
-                    pipeline_options=pipeline_options
-                )
+                # Shared DocumentConverter with optimized settings (no OCR: PaddleOCR is the fallback)
+                self.converter = get_pdf_converter(do_ocr=False, do_table_structure=True)
                 logger.info("Docling initialized successfully")
             except Exception as e:
                 logger.warning(f"Failed to initialize Docling: {e}. Will use fallback.")
@@ -56,17 +190,25 @@ class DoclingService:
             tables_text: str,
             sections: List[Dict]
         }
+        Unchanged files are served from the on-disk parse cache.
         """
+        namespace = "docling" if self.docling_available and self.converter else "docling.fallback"
+        return cached_parse(namespace, filepath, self._parse_pdf_to_structured_text)
+    
+    def _parse_pdf_to_structured_text(self, filepath: str) -> Dict[str, Any]:
+        """Uncached parse behind parse_pdf_to_structured_text"""
         # Fallback if Docling not available
         if not self.docling_available or not self.converter:
             return self._fallback_extraction(filepath)
         
         try:
-            # Basic corrupted-PDF validation using pypdf
+            # Basic corrupted-PDF validation: header/trailer check, full pypdf parse only if that fails.
+            # The file is read once; validation, Docling and the fallback each get a stream over these bytes.
             try:
-                import pypdf
-                with open(filepath, "rb") as f:
-                    pypdf.PdfReader(f)  # Will raise on severely corrupted PDFs
+                pdf_bytes = read_pdf_bytes(filepath)
+                if not looks_like_pdf(pdf_bytes):
+                    import pypdf
+                    pypdf.PdfReader(pdf_bytes)  # Will raise on severely corrupted PDFs
             except Exception as pdf_err:
                 logger.error(f"Invalid or corrupted PDF file: {pdf_err}")
                 return {
@@ -80,113 +222,89 @@ class DoclingService:
                 }
 
             # Convert document with timeout protection (15 seconds max)
-            from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-            
-            def run_docling():
-                return self.converter.convert(filepath)
-            
+            source = filepath
+            if DOCLING_AVAILABLE:
+                source = DocumentStream(name=Path(filepath).name, stream=io.BytesIO(pdf_bytes.getvalue()))
+            future = _DOCLING_EXECUTOR.submit(self.converter.convert, source)
             try:
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(run_docling)
-                    result = future.result(timeout=15)  # 15 second timeout
+                result = future.result(timeout=DOCLING_TIMEOUT_SECONDS)
             except FuturesTimeoutError:
-                logger.warning(f"⏱️ Docling parsing timed out after 15s for {filepath}, using fallback...")
-                return self._fallback_extraction(filepath)
+                # Drops the conversion if it is still queued; a running one cannot be interrupted
+                future.cancel()
+                logger.warning(f"⏱️ Docling parsing timed out after {DOCLING_TIMEOUT_SECONDS}s for {filepath}, using fallback...")
+                return self._docling_fallback(filepath, pdf_bytes)
             except Exception as docling_err:
                 logger.warning(f"Docling conversion failed: {docling_err}, using fallback...")
-                return self._fallback_extraction(filepath)
+                return self._docling_fallback(filepath, pdf_bytes)
             
             doc = result.document
             
             # Extract full text
             full_text_parts = []
-            section_chunks = []
             tables_text_parts = []
-            sections = []
+            section_runs: List[_Section] = []
             
             # Process document structure
             current_section = None
             current_page = 1
             
             for item in doc.items:
+                # Item types differ in which of these they carry; read each attribute once
+                text = getattr(item, 'text', None)
+                table = getattr(item, 'table', None)
+                page = getattr(item, 'page', None)
+                
                 # Extract text from different item types
-                if hasattr(item, 'text'):
-                    text = item.text
-                    if text and text.strip():
-                        full_text_parts.append(text.strip())
-                        
-                        # Track sections
-                        if hasattr(item, 'level') and item.level:
-                            # This is a heading
-                            section_name = text.strip()
-                            current_section = {
-                                "title": section_name,
-                                "level": item.level,
-                                "page": current_page,
-                                "content": []
-                            }
-                            sections.append(current_section)
-                        elif current_section:
-                            current_section["content"].append(text.strip())
-                        else:
-                            # No section, create default
-                            if not sections:
-                                current_section = {
-                                    "title": "Introduction",
-                                    "level": 1,
-                                    "page": current_page,
-                                    "content": []
-                                }
-                                sections.append(current_section)
-                            current_section["content"].append(text.strip())
+                stripped = text.strip() if text else ""
+                if stripped:
+                    full_text_parts.append(stripped)
+                    
+                    # Track sections
+                    level = getattr(item, 'level', None)
+                    if level:
+                        # This is a heading
+                        current_section = _Section(stripped, level, current_page)
+                        section_runs.append(current_section)
+                    elif current_section:
+                        current_section.content.append(stripped)
+                    else:
+                        # No section, create default
+                        if not section_runs:
+                            current_section = _Section("Introduction", 1, current_page)
+                            section_runs.append(current_section)
+                        current_section.content.append(stripped)
                 
                 # Extract tables
-                if hasattr(item, 'table') and item.table:
-                    table_text = self._table_to_text(item.table)
+                if table:
+                    table_text = self._table_to_text(table)
                     tables_text_parts.append(table_text)
                     full_text_parts.append(f"\n[TABLE]\n{table_text}\n[/TABLE]\n")
                 
                 # Track page numbers
-                if hasattr(item, 'page') and item.page:
-                    current_page = item.page
+                if page:
+                    current_page = page
             
             # Combine all text
             full_text = "\n\n".join(full_text_parts)
             tables_text = "\n\n".join(tables_text_parts)
+            sections = [section.to_dict() for section in section_runs]
 
             # Debug: log Docling extraction stats
             logger.info(f"DOC LING FULL TEXT LENGTH: {len(full_text)}")
             logger.info(f"DOC LING SECTIONS COUNT: {len(sections)}")
             logger.info(f"DOC LING TABLE TEXT LENGTH: {len(tables_text)}")
 
-            # Debug: write to disk per-file in storage/debug
-            try:
-                debug_dir = Path("storage") / "debug"
-                debug_dir.mkdir(parents=True, exist_ok=True)
+            # Debug: write to disk per-file in storage/debug (sections serialized now, before callers mutate them)
+            if settings.DOCLING_DEBUG_FILES:
                 stem = Path(filepath).stem
-
-                full_path = debug_dir / f"{stem}_full_text_docling.txt"
-                sections_path = debug_dir / f"{stem}_sections_docling.json"
-                tables_path = debug_dir / f"{stem}_tables_docling.txt"
-
-                with open(full_path, "w", encoding="utf-8") as f_full:
-                    f_full.write(full_text)
-                with open(sections_path, "w", encoding="utf-8") as f_sec:
-                    json.dump(sections, f_sec, ensure_ascii=False, indent=2)
-                with open(tables_path, "w", encoding="utf-8") as f_tab:
-                    f_tab.write(tables_text)
-            except Exception as debug_err:
-                logger.warning(f"Failed to write Docling debug files: {debug_err}")
+                queue_debug_files({
+                    f"{stem}_full_text_docling.txt": full_text,
+                    f"{stem}_sections_docling.json": json.dumps(sections, ensure_ascii=False, indent=2),
+                    f"{stem}_tables_docling.txt": tables_text,
+                }, "Docling")
             
             # Create section chunks
-            for section in sections:
-                section_text = "\n".join(section["content"])
-                section_chunks.append({
-                    "title": section["title"],
-                    "level": section["level"],
-                    "page": section.get("page", 1),
-                    "text": section_text
-                })
+            section_chunks = [section.to_chunk() for section in section_runs]
             
             return {
                 "full_text": full_text,
@@ -243,21 +361,20 @@ class DoclingService:
             logger.error(f"Section extraction error: {e}")
             return []
     
+    def _table_to_rows(self, table) -> List[List[str]]:
+        """Cell texts of a Docling table, row by row"""
+        rows = []
+        for row in getattr(table, 'rows', ()):
+            rows.append([
+                (cell.text or "") if hasattr(cell, 'text') else str(cell)
+                for cell in getattr(row, 'cells', ())
+            ])
+        return rows
+    
     def _table_to_text(self, table) -> str:
         """Convert Docling table to text format"""
         try:
-            rows = []
-            if hasattr(table, 'rows'):
-                for row in table.rows:
-                    cells = []
-                    if hasattr(row, 'cells'):
-                        for cell in row.cells:
-                            if hasattr(cell, 'text'):
-                                cells.append(cell.text or "")
-                            else:
-                                cells.append(str(cell))
-                    rows.append(" | ".join(cells))
-            return "\n".join(rows)
+            return "\n".join(" | ".join(cells) for cells in self._table_to_rows(table))
         except Exception as e:
             logger.warning(f"Table to text conversion error: {e}")
             return ""
@@ -265,17 +382,7 @@ class DoclingService:
     def _table_to_dict(self, table) -> Dict[str, Any]:
         """Convert Docling table to dictionary"""
         try:
-            rows = []
-            if hasattr(table, 'rows'):
-                for row in table.rows:
-                    cells = []
-                    if hasattr(row, 'cells'):
-                        for cell in row.cells:
-                            if hasattr(cell, 'text'):
-                                cells.append(cell.text or "")
-                            else:
-                                cells.append(str(cell))
-                    rows.append(cells)
+            rows = self._table_to_rows(table)
             
             return {
                 "rows": rows,
@@ -286,21 +393,29 @@ class DoclingService:
             logger.warning(f"Table to dict conversion error: {e}")
             return {"rows": [], "row_count": 0, "column_count": 0}
     
-    def _fallback_extraction(self, filepath: str) -> Dict[str, Any]:
-        """Fallback extraction using PyPDF when Docling is not available"""
+    def _docling_fallback(self, filepath: str, pdf_bytes: io.BytesIO) -> Dict[str, Any]:
+        """
+        PyPDF stand-in for a Docling conversion that timed out or failed. Flagged as a fallback so
+        the parse cache does not keep it: the next call retries Docling.
+        """
+        result = self._fallback_extraction(filepath, pdf_bytes)
+        result["fallback"] = True
+        return result
+    
+    def _fallback_extraction(self, filepath: str, pdf_bytes: Optional[io.BytesIO] = None) -> Dict[str, Any]:
+        """Fallback extraction using PyPDF when Docling is not available (pdf_bytes: the file, if already read)"""
         try:
             import pypdf
             
             full_text_parts = []
-            with open(filepath, 'rb') as file:
-                pdf_reader = pypdf.PdfReader(file)
-                num_pages = len(pdf_reader.pages)
-                
-                for page_num in range(num_pages):
-                    page = pdf_reader.pages[page_num]
-                    text = page.extract_text()
-                    if text:
-                        full_text_parts.append(f"[Page {page_num + 1}]\n{text}")
+            if pdf_bytes is None:
+                pdf_bytes = read_pdf_bytes(filepath)
+            pdf_reader = pypdf.PdfReader(io.BytesIO(pdf_bytes.getvalue()))
+            num_pages = len(pdf_reader.pages)
+            
+            for page_num, text in enumerate(extract_page_texts(pdf_reader, filepath)):
+                if text:
+                    full_text_parts.append(f"[Page {page_num + 1}]\n{text}")
             
             full_text = "\n\n".join(full_text_parts)
 
@@ -317,15 +432,7 @@ class DoclingService:
             }
 
             # Debug: also write fallback text to disk
-            try:
-                debug_dir = Path("storage") / "debug"
-                debug_dir.mkdir(parents=True, exist_ok=True)
-                stem = Path(filepath).stem
-                full_path = debug_dir / f"{stem}_full_text_fallback.txt"
-                with open(full_path, "w", encoding="utf-8") as f_full:
-                    f_full.write(full_text)
-            except Exception as debug_err:
-                logger.warning(f"Failed to write fallback debug files: {debug_err}")
+            queue_debug_files({f"{Path(filepath).stem}_full_text_fallback.txt": full_text}, "fallback")
 
             return result
         except Exception as e:
@@ -5,150 +5,256 @@ Returns only evidence that actually exists - no defaults or placeholders.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from config.database import get_db, close_db, Block, File
 import re
 
 logger = logging.getLogger(__name__)
 
+# Placeholder values that do not count as evidence (only strings can equal these, so the
+# lookup is gated on str: block values may be unhashable lists/dicts)
+_NULLISH = frozenset(["", "null", "None", "N/A", "n/a"])
 
-def find_best_evidence(
+
+def _is_meaningful(value: Any) -> bool:
+    """True for a value that can serve as evidence (truthy and not a placeholder string)"""
+    if not value:
+        return False
+    return not isinstance(value, str) or value not in _NULLISH
+
+
+class _AliasSearch:
+    """Running best evidence for one alias group while the batch's blocks are walked"""
+    
+    def __init__(self, key_aliases: List[str], min_confidence: float, early_exit_confidence: float):
+        self.key_aliases = key_aliases
+        self.aliases_lower = [alias.lower() for alias in key_aliases]
+        # Prefilters: one search tells whether any alias occurs in a string, one substring test against
+        # the NUL-joined aliases whether a key occurs in any alias. Only strings passing them get the
+        # per-alias checks below, which decide the match type and keep the alias-order tie-breaking.
+        self.alias_re = re.compile("|".join(re.escape(alias) for alias in self.aliases_lower))
+        self.aliases_joined = "\0".join(self.aliases_lower)
+        self.min_confidence = min_confidence
+        self.early_exit_confidence = early_exit_confidence
+        self.best_evidence = None
+        self.best_confidence = 0.0
+        # Table-cell matches rank after field matches: one only wins with a strictly higher confidence
+        self.best_table_evidence = None
+        self.best_table_confidence = 0.0
+        self.done = False
+    
+    def search_block(self, block: Block, fields: list, cells) -> None:
+        """
+        Search one block's lowercased fields, then (lazily built) table cells.
+        fields: (key_lower, value, value_lower or None, meaningful) per block data item.
+        cells: callable returning (cell_key, cell_value, cell_lower) per string table cell.
+        """
+        alias_re = self.alias_re
+        aliases_joined = self.aliases_joined
+        min_confidence = self.min_confidence
+        # Keep only keys that can match some alias
+        fields = [
+            field for field in fields
+            if alias_re.search(field[0]) or field[0] in aliases_joined
+            or (field[2] is not None and alias_re.search(field[2]))
+        ]
+        
+        # 1. Search block storage fields: each alias against block data keys and values
+        for alias_lower in self.aliases_lower:
+            # Check if alias matches any key in block data
+            for key_lower, value, value_lower, meaningful in fields:
+                # Exact key match
+                if alias_lower == key_lower:
+                    if meaningful:
+                        confidence = float(block.confidence) if block.confidence else 0.5
+                        if confidence >= min_confidence:
+                            evidence = {
+                                "value": value,
+                                "snippet": block.evidence_snippet or str(value),
+                                "page": block.evidence_page or 1,
+                                "source_doc": block.source_doc or "unknown",
+                                "confidence": confidence,
+                                "match_type": "block_key_exact"
+                            }
+                            if confidence > self.best_confidence:
+                                self.best_evidence = evidence
+                                self.best_confidence = confidence
+                
+                # Partial key match (alias in key or key in alias)
+                elif alias_lower in key_lower or key_lower in alias_lower:
+                    if meaningful:
+                        confidence = float(block.confidence) * 0.8 if block.confidence else 0.4
+                        if confidence >= min_confidence:
+                            evidence = {
+                                "value": value,
+                                "snippet": block.evidence_snippet or str(value),
+                                "page": block.evidence_page or 1,
+                                "source_doc": block.source_doc or "unknown",
+                                "confidence": confidence,
+                                "match_type": "block_key_partial"
+                            }
+                            if confidence > self.best_confidence:
+                                self.best_evidence = evidence
+                                self.best_confidence = confidence
+                
+                # Check if alias appears in value (string search)
+                if value_lower is not None and alias_lower in value_lower:
+                    confidence = float(block.confidence) * 0.7 if block.confidence else 0.35
+                    if confidence >= min_confidence:
+                        evidence = {
+                            "value": value,
+                            "snippet": block.evidence_snippet or value[:200],
+                            "page": block.evidence_page or 1,
+                            "source_doc": block.source_doc or "unknown",
+                            "confidence": confidence,
+                            "match_type": "block_value_match"
+                        }
+                        if confidence > self.best_confidence:
+                            self.best_evidence = evidence
+                            self.best_confidence = confidence
+            
+            if self.best_confidence >= self.early_exit_confidence:
+                break
+        
+        # A near-certain field match is good enough: skip the remaining aliases, tables and blocks
+        if self.best_confidence >= self.early_exit_confidence:
+            self.done = True
+            return
+        
+        # 2. Search tables stored in block data as lists of dicts (infrastructure, lab blocks)
+        for cell_key, cell_value, cell_lower in cells():
+            # Every alias found in a cell yields the same evidence, so one search decides
+            if alias_re.search(cell_lower):
+                confidence = float(block.confidence) * 0.6 if block.confidence else 0.3
+                if confidence >= min_confidence:
+                    evidence = {
+                        "value": cell_value,
+                        "snippet": f"{cell_key}: {cell_value}",
+                        "page": block.evidence_page or 1,
+                        "source_doc": block.source_doc or "unknown",
+                        "confidence": confidence,
+                        "match_type": "table_cell_match"
+                    }
+                    if confidence > self.best_table_confidence:
+                        self.best_table_evidence = evidence
+                        self.best_table_confidence = confidence
+    
+    def result(self) -> Optional[Dict[str, Any]]:
+        if self.best_table_confidence > self.best_confidence:
+            return self.best_table_evidence
+        return self.best_evidence
+
+
+def _table_cells(block_data: Dict[str, Any]) -> List[Tuple[Any, str, str]]:
+    """(cell_key, cell_value, lowercased value) for string cells of list-of-dict values, in order"""
+    cells = []
+    for value in block_data.values():
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            for row in value:
+                if not isinstance(row, dict):
+                    continue
+                for cell_key, cell_value in row.items():
+                    if isinstance(cell_value, str):
+                        cells.append((cell_key, cell_value, cell_value.lower()))
+    return cells
+
+
+def find_best_evidence_batch(
     batch_id: str,
-    key_aliases: List[str],
-    min_confidence: float = 0.40
-) -> Optional[Dict[str, Any]]:
+    key_groups: Dict[str, List[str]],
+    min_confidence: float = 0.40,
+    early_exit_confidence: float = 0.95
+) -> Dict[str, Optional[Dict[str, Any]]]:
     """
-    Find best evidence for a given key by searching aliases.
-    
-    Search order:
-    1. Block storage fields (exact match or alias variants)
-    2. Full context text (exact keyword + numeric/date nearby)
-    3. Tables extracted by Docling (search cell text)
+    find_best_evidence for several keys in one walk over the batch's blocks.
+    Each block's keys, values and table cells are lowercased once and searched for every key
+    still looking; a key stops at its first near-certain match.
     
     Args:
         batch_id: Batch ID to search
-        key_aliases: List of aliases to search for (e.g., ["fire_noc", "fire_safety", "fire_certificate"])
+        key_groups: Aliases per key (e.g., {"fire_noc": ["fire_noc", "fire_safety"]})
         min_confidence: Minimum confidence threshold (default 0.40)
+        early_exit_confidence: Stop searching a key once a match is at least this confident (default 0.95)
     
     Returns:
-        Dict with: {value, snippet, page, source_doc, confidence, match_type}
-        or None if no evidence found
+        Dict mapping each key to its evidence ({value, snippet, page, source_doc, confidence,
+        match_type}) or None if no evidence found
     """
-    if not key_aliases:
-        return None
+    searches = {
+        key: _AliasSearch(key_aliases, min_confidence, early_exit_confidence)
+        for key, key_aliases in key_groups.items() if key_aliases
+    }
     
     db = get_db()
-    best_evidence = None
-    best_confidence = 0.0
     
     try:
-        # 1. Search block storage fields
+        # Blocks are fetched once for all keys (full context text is not stored in the DB,
+        # so block-level evidence is all we search)
         blocks = db.query(Block).filter(Block.batch_id == batch_id).all()
         
         for block in blocks:
+            active = [search for search in searches.values() if not search.done]
+            if not active:
+                break
             block_data = block.data or {}
             if not isinstance(block_data, dict):
                 continue
             
-            # Check each alias against block data keys and values
-            for alias in key_aliases:
-                alias_lower = alias.lower()
-                
-                # Check if alias matches any key in block data
-                for key, value in block_data.items():
-                    key_lower = key.lower()
-                    
-                    # Exact key match
-                    if alias_lower == key_lower:
-                        if value and value not in [None, "", "null", "None", "N/A", "n/a"]:
-                            confidence = float(block.confidence) if block.confidence else 0.5
-                            if confidence >= min_confidence:
-                                evidence = {
-                                    "value": value,
-                                    "snippet": block.evidence_snippet or str(value),
-                                    "page": block.evidence_page or 1,
-                                    "source_doc": block.source_doc or "unknown",
-                                    "confidence": confidence,
-                                    "match_type": "block_key_exact"
-                                }
-                                if confidence > best_confidence:
-                                    best_evidence = evidence
-                                    best_confidence = confidence
-                    
-                    # Partial key match (alias in key or key in alias)
-                    elif alias_lower in key_lower or key_lower in alias_lower:
-                        if value and value not in [None, "", "null", "None", "N/A", "n/a"]:
-                            confidence = float(block.confidence) * 0.8 if block.confidence else 0.4
-                            if confidence >= min_confidence:
-                                evidence = {
-                                    "value": value,
-                                    "snippet": block.evidence_snippet or str(value),
-                                    "page": block.evidence_page or 1,
-                                    "source_doc": block.source_doc or "unknown",
-                                    "confidence": confidence,
-                                    "match_type": "block_key_partial"
-                                }
-                                if confidence > best_confidence:
-                                    best_evidence = evidence
-                                    best_confidence = confidence
-                    
-                    # Check if alias appears in value (string search)
-                    if isinstance(value, str) and alias_lower in value.lower():
-                        confidence = float(block.confidence) * 0.7 if block.confidence else 0.35
-                        if confidence >= min_confidence:
-                            evidence = {
-                                "value": value,
-                                "snippet": block.evidence_snippet or value[:200],
-                                "page": block.evidence_page or 1,
-                                "source_doc": block.source_doc or "unknown",
-                                "confidence": confidence,
-                                "match_type": "block_value_match"
-                            }
-                            if confidence > best_confidence:
-                                best_evidence = evidence
-                                best_confidence = confidence
-        
-        # 2. Search full context text (if we have stored full text)
-        # Note: We don't store full text in DB, so we'd need to reconstruct from blocks
-        # For now, we rely on block-level evidence which is more reliable
-        
-        # 3. Search tables (if stored in block data as structured tables)
-        # Tables are typically in infrastructure or lab blocks
-        for block in blocks:
-            block_data = block.data or {}
-            if not isinstance(block_data, dict):
-                continue
+            fields = [
+                (key.lower(), value, value.lower() if isinstance(value, str) else None, _is_meaningful(value))
+                for key, value in block_data.items()
+            ]
+            cells = None
+            
+            def block_cells():
+                nonlocal cells
+                if cells is None:
+                    cells = _table_cells(block_data)
+                return cells
             
-            # Look for table-like structures (lists of dicts)
-            for key, value in block_data.items():
-                if isinstance(value, list) and len(value) > 0:
-                    # Check if it's a table (list of dicts)
-                    if isinstance(value[0], dict):
-                        for row in value:
-                            for cell_key, cell_value in row.items():
-                                if isinstance(cell_value, str):
-                                    for alias in key_aliases:
-                                        if alias.lower() in cell_value.lower():
-                                            confidence = float(block.confidence) * 0.6 if block.confidence else 0.3
-                                            if confidence >= min_confidence:
-                                                evidence = {
-                                                    "value": cell_value,
-                                                    "snippet": f"{cell_key}: {cell_value}",
-                                                    "page": block.evidence_page or 1,
-                                                    "source_doc": block.source_doc or "unknown",
-                                                    "confidence": confidence,
-                                                    "match_type": "table_cell_match"
-                                                }
-                                                if confidence > best_confidence:
-                                                    best_evidence = evidence
-                                                    best_confidence = confidence
+            for search in active:
+                search.search_block(block, fields, block_cells)
     
     except Exception as e:
-        logger.error(f"Error searching evidence for {key_aliases}: {e}")
+        logger.error(f"Error searching evidence for {list(key_groups.values())}: {e}")
+        # Keep the field matches found so far; partial table results are not trusted
+        return {
+            key: searches[key].best_evidence if key in searches else None
+            for key in key_groups
+        }
     finally:
         close_db(db)
     
-    return best_evidence
+    return {key: searches[key].result() if key in searches else None for key in key_groups}
+
+
+def find_best_evidence(
+    batch_id: str,
+    key_aliases: List[str],
+    min_confidence: float = 0.40,
+    early_exit_confidence: float = 0.95
+) -> Optional[Dict[str, Any]]:
+    """
+    Find best evidence for a given key by searching aliases.
+    
+    Search order:
+    1. Block storage fields (exact match or alias variants)
+    2. Full context text (exact keyword + numeric/date nearby)
+    3. Tables extracted by Docling (search cell text)
+    
+    Args:
+        batch_id: Batch ID to search
+        key_aliases: List of aliases to search for (e.g., ["fire_noc", "fire_safety", "fire_certificate"])
+        min_confidence: Minimum confidence threshold (default 0.40)
+        early_exit_confidence: Stop searching once a match is at least this confident (default 0.95)
+    
+    Returns:
+        Dict with: {value, snippet, page, source_doc, confidence, match_type}
+        or None if no evidence found
+    """
+    if not key_aliases:
+        return None
+    return find_best_evidence_batch(batch_id, {"": key_aliases}, min_confidence, early_exit_confidence)[""]
 
 
 def check_block_examined(
@@ -165,19 +271,18 @@ def check_block_examined(
     Returns:
         True if at least one block type was examined, False otherwise
     """
+    if not block_types:
+        return False
+    
     db = get_db()
     try:
-        blocks = db.query(Block).filter(Block.batch_id == batch_id).all()
-        
-        examined_types = set()
-        for block in blocks:
-            block_data = block.data or {}
-            # If block has data (even if empty dict), it was examined
-            if isinstance(block_data, dict):
-                examined_types.add(block.block_type)
-        
-        # Check if any of the requested block types were examined
-        return any(bt in examined_types for bt in block_types)
+        # Only the requested types' data column is read (idx_blocks_batch_type covers the filter)
+        rows = db.query(Block.data).filter(
+            Block.batch_id == batch_id,
+            Block.block_type.in_(block_types),
+        )
+        # If block has data (even if empty dict), it was examined
+        return any(isinstance(data or {}, dict) for (data,) in rows)
     
     except Exception as e:
         logger.error(f"Error checking examined blocks: {e}")
@@ -3,12 +3,18 @@ Document Forgery Detection Service.
 Checks documents for signs of tampering, manipulation, or inauthenticity.
 """
 
+import heapq
 import logging
 import re
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 from datetime import datetime
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,6 +26,9 @@ SUSPICIOUS_PRODUCERS = [
     "adobe reader",  # Reader can't create, only view - suspicious if listed as producer
 ]
 
+# One alternation over all producer names, so the producer string is scanned once
+_SUSPICIOUS_PRODUCER_RE = re.compile("|".join(re.escape(name) for name in SUSPICIOUS_PRODUCERS))
+
 # Patterns that suggest AI-generated or templated content
 SUSPICIOUS_PATTERNS = [
     r"\b(\d{3,})\b.*\b\1\b.*\b\1\b",  # Same number repeated 3+ times
@@ -29,10 +38,29 @@ SUSPICIOUS_PATTERNS = [
     r"<.*?>",  # HTML tags in document
 ]
 
+# Compiled once; check_text_anomalies only needs to know whether each pattern occurs
+_SUSPICIOUS_PATTERNS_COMPILED = tuple((p, re.compile(p, re.IGNORECASE)) for p in SUSPICIOUS_PATTERNS)
+
+# More distinct fonts than this in the first pages suggests copy-paste manipulation
+MAX_DISTINCT_FONTS = 15
+
+# Standard PDF/system font families (lowercase), matched as substrings of font names
+_SYSTEM_FONTS_LOWER = ('arial', 'times', 'helvetica', 'courier')
+
+# Above this many distinct letters (e.g. CJK text), letters are counted in one Counter pass instead
+_MAX_SCANNED_LETTERS = 128
 
-def check_pdf_metadata(file_path: str) -> Tuple[bool, List[str]]:
+# ASCII code points that are letters, for counting ASCII text in a single bincount
+_ASCII_LETTERS = np.array([code for code in range(128) if chr(code).isalpha()])
+
+# Numbers of 4+ digits, counted for repeated-value noise
+_NUMBER_RE = re.compile(r'\b\d{4,}\b')
+
+
+def check_pdf_metadata(file_path: str, reader=None) -> Tuple[bool, List[str]]:
     """
     Check PDF metadata for anomalies.
+    reader: an already opened pypdf.PdfReader for file_path (opened here if None).
     
     Returns: (is_suspicious, list of issues)
     """
@@ -41,42 +69,43 @@ def check_pdf_metadata(file_path: str) -> Tuple[bool, List[str]]:
     try:
         import pypdf
         
-        with open(file_path, 'rb') as f:
-            reader = pypdf.PdfReader(f)
-            metadata = reader.metadata
-            
-            if not metadata:
-                issues.append("No metadata found - potentially stripped")
-                return len(issues) > 1, issues
-            
-            # Check creation vs modification date
-            created = metadata.get('/CreationDate', '')
-            modified = metadata.get('/ModDate', '')
-            
-            if created and modified:
-                try:
-                    # Parse PDF date format (D:YYYYMMDDHHmmSS)
-                    created_dt = _parse_pdf_date(created)
-                    modified_dt = _parse_pdf_date(modified)
-                    
-                    if created_dt and modified_dt:
-                        if created_dt > modified_dt:
-                            issues.append(f"Creation date ({created_dt}) > Modification date ({modified_dt})")
-                except:
-                    pass
-            
-            # Check producer
-            producer = str(metadata.get('/Producer', '')).lower()
-            for suspicious in SUSPICIOUS_PRODUCERS:
-                if suspicious in producer:
-                    issues.append(f"Suspicious PDF producer detected: {producer}")
-                    break
-            
-            # Check creator
-            creator = str(metadata.get('/Creator', '')).lower()
-            if not creator or creator in ['', 'unknown', 'none']:
-                issues.append("Missing/unknown document creator")
-            
+        if reader is None:
+            # Only the trailer and Info dictionary are needed: read them through the open file,
+            # seeking as needed, instead of loading the whole PDF into memory
+            with open(file_path, "rb") as f:
+                return check_pdf_metadata(file_path, pypdf.PdfReader(f, strict=False))
+        metadata = reader.metadata
+        
+        if not metadata:
+            issues.append("No metadata found - potentially stripped")
+            return len(issues) > 1, issues
+        
+        # Check creation vs modification date
+        created = metadata.get('/CreationDate', '')
+        modified = metadata.get('/ModDate', '')
+        
+        if created and modified:
+            try:
+                # Parse PDF date format (D:YYYYMMDDHHmmSS)
+                created_dt = _parse_pdf_date(created)
+                modified_dt = _parse_pdf_date(modified)
+                
+                if created_dt and modified_dt:
+                    if created_dt > modified_dt:
+                        issues.append(f"Creation date ({created_dt}) > Modification date ({modified_dt})")
+            except:
+                pass
+        
+        # Check producer
+        producer = str(metadata.get('/Producer', '')).lower()
+        if _SUSPICIOUS_PRODUCER_RE.search(producer):
+            issues.append(f"Suspicious PDF producer detected: {producer}")
+        
+        # Check creator
+        creator = str(metadata.get('/Creator', '')).lower()
+        if not creator or creator in ['', 'unknown', 'none']:
+            issues.append("Missing/unknown document creator")
+        
     except Exception as e:
         logger.warning(f"Error checking PDF metadata: {e}")
         issues.append(f"Could not read PDF metadata: {str(e)[:50]}")
@@ -85,8 +114,9 @@ def check_pdf_metadata(file_path: str) -> Tuple[bool, List[str]]:
     return len(issues) >= 2, issues
 
 
+@lru_cache(maxsize=1024)
 def _parse_pdf_date(date_str: str) -> datetime:
-    """Parse PDF date format to datetime."""
+    """Parse PDF date format to datetime (memoized: batches share timestamps)."""
     try:
         # Format: D:YYYYMMDDHHmmSS(+/-HH'mm')
         date_str = date_str.replace("D:", "").replace("'", "")
@@ -97,6 +127,22 @@ def _parse_pdf_date(date_str: str) -> datetime:
     return None
 
 
+def _letter_counts(text: str) -> Dict[str, int]:
+    """
+    Occurrences of each letter in text.
+    ASCII text is counted in one NumPy bincount over its bytes. Otherwise, with a small alphabet,
+    one str.count (a C scan) per distinct letter beats a per-character loop.
+    """
+    if text.isascii():
+        counts = np.bincount(np.frombuffer(text.encode("ascii"), dtype=np.uint8), minlength=128)
+        present = _ASCII_LETTERS[counts[_ASCII_LETTERS] > 0]
+        return dict(zip(map(chr, present.tolist()), counts[present].tolist()))
+    letters = [char for char in set(text) if char.isalpha()]
+    if len(letters) <= _MAX_SCANNED_LETTERS:
+        return {char: text.count(char) for char in letters}
+    return {char: count for char, count in Counter(text).items() if char.isalpha()}
+
+
 def check_text_anomalies(extracted_text: str) -> Tuple[bool, List[str]]:
     """
     Check extracted text for suspicious patterns.
@@ -110,31 +156,28 @@ def check_text_anomalies(extracted_text: str) -> Tuple[bool, List[str]]:
         return True, issues
     
     # Check for suspicious patterns
-    for pattern in SUSPICIOUS_PATTERNS:
-        matches = re.findall(pattern, extracted_text, re.IGNORECASE)
-        if matches:
+    for pattern, compiled in _SUSPICIOUS_PATTERNS_COMPILED:
+        if compiled.search(extracted_text):
             issues.append(f"Suspicious pattern found: {pattern[:30]}...")
     
     # Check for repeated numeric sequences (AI-generated noise)
-    numbers = re.findall(r'\b\d{4,}\b', extracted_text)
-    if numbers:
-        from collections import Counter
-        num_counts = Counter(numbers)
-        for num, count in num_counts.most_common(5):
-            if count > 5:
-                issues.append(f"Number '{num}' repeated {count} times")
+    # Matches stream straight into the Counter; no list of every number is built
+    num_counts = Counter(map(re.Match.group, _NUMBER_RE.finditer(extracted_text)))
+    # Only numbers seen more than 5 times can be reported, so rank just those (top 5, ties in first-seen order)
+    repeated = [(num, count) for num, count in num_counts.items() if count > 5]
+    for num, count in heapq.nlargest(5, repeated, key=itemgetter(1)):
+        issues.append(f"Number '{num}' repeated {count} times")
     
     # Check character distribution (too uniform = suspicious)
     if len(extracted_text) > 1000:
-        char_counts = {}
-        for char in extracted_text.lower():
-            if char.isalpha():
-                char_counts[char] = char_counts.get(char, 0) + 1
+        char_counts = _letter_counts(extracted_text.lower())
         
         if char_counts:
             values = list(char_counts.values())
-            avg = sum(values) / len(values)
-            variance = sum((x - avg) ** 2 for x in values) / len(values)
+            # Counts are ints: the sums stay exact, so the one-division formula cannot lose precision
+            n = len(values)
+            total = sum(values)
+            variance = (n * sum(x * x for x in values) - total * total) / (n * n)
             
             # Very low variance suggests generated text
             if variance < 10 and len(values) > 20:
@@ -157,16 +200,16 @@ def check_text_ocr_mismatch(
     if not docling_text or not ocr_text:
         return False, "Insufficient text for comparison"
     
-    # Normalize texts
-    docling_words = set(docling_text.lower().split())
-    ocr_words = set(ocr_text.lower().split())
+    # Normalize texts into word counts (repeated words count, so dropped or duplicated lines show up)
+    docling_words = Counter(docling_text.lower().split())
+    ocr_words = Counter(ocr_text.lower().split())
     
     if not docling_words or not ocr_words:
         return False, "No words extracted"
     
-    # Calculate Jaccard similarity
-    intersection = len(docling_words & ocr_words)
-    union = len(docling_words | ocr_words)
+    # Calculate multiset Jaccard similarity; union = |A| + |B| - |A & B| avoids building the union
+    intersection = sum(min(count, ocr_words[word]) for word, count in docling_words.items() if word in ocr_words)
+    union = docling_words.total() + ocr_words.total() - intersection
     
     if union == 0:
         return False, "No words to compare"
@@ -180,10 +223,11 @@ def check_text_ocr_mismatch(
     return False, f"Text-to-OCR match: {similarity*100:.1f}%"
 
 
-def check_font_anomalies(file_path: str) -> Tuple[bool, List[str]]:
+def check_font_anomalies(file_path: str, reader=None) -> Tuple[bool, List[str]]:
     """
     Check for font substitution anomalies.
     Multiple incompatible fonts or missing font info can indicate manipulation.
+    reader: an already opened pypdf.PdfReader for file_path (opened here if None).
     
     Returns: (is_suspicious, list of issues)
     """
@@ -192,38 +236,65 @@ def check_font_anomalies(file_path: str) -> Tuple[bool, List[str]]:
     try:
         import pypdf
         
-        with open(file_path, 'rb') as f:
-            reader = pypdf.PdfReader(f)
-            
-            all_fonts = set()
-            for page in reader.pages[:10]:  # Check first 10 pages
-                if '/Font' in page.get('/Resources', {}):
-                    fonts = page['/Resources']['/Font']
-                    if fonts:
-                        for font_key in fonts.keys():
-                            font = fonts[font_key]
-                            if hasattr(font, 'get'):
-                                font_name = font.get('/BaseFont', str(font_key))
-                                all_fonts.add(str(font_name))
-            
-            # Too many different fonts suggests copy-paste manipulation
-            if len(all_fonts) > 15:
-                issues.append(f"Excessive font variety: {len(all_fonts)} fonts detected")
+        if reader is None:
+            reader = pypdf.PdfReader(file_path)
+        
+        all_fonts = set()
+        # (resource name, object number, generation) of fonts already resolved on an earlier page;
+        # keyed on the numbers because IndirectObject is not hashable in every pypdf release
+        seen_refs = set()
+        has_system = False
+        non_system_count = 0
+        for page in reader.pages[:10]:  # Check first 10 pages (pages are loaded as the loop reaches them)
+            if '/Font' in page.get('/Resources', {}):
+                fonts = page['/Resources']['/Font']
+                if fonts:
+                    for font_key, font_ref in fonts.items():
+                        if isinstance(font_ref, pypdf.generic.IndirectObject):
+                            ref_key = (font_key, font_ref.idnum, font_ref.generation)
+                            if ref_key in seen_refs:
+                                continue
+                            seen_refs.add(ref_key)
+                        font = font_ref.get_object()
+                        if hasattr(font, 'get'):
+                            font_name = str(font.get('/BaseFont', str(font_key)))
+                            if font_name not in all_fonts:
+                                all_fonts.add(font_name)
+                                if any(sf in font_name.lower() for sf in _SYSTEM_FONTS_LOWER):
+                                    has_system = True
+                                else:
+                                    non_system_count += 1
             
-            # Check for system fonts mixed with document fonts
-            system_fonts = {'Arial', 'Times', 'Helvetica', 'Courier'}
-            has_system = any(any(sf.lower() in f.lower() for sf in system_fonts) for f in all_fonts)
-            non_system = [f for f in all_fonts if not any(sf.lower() in f.lower() for sf in system_fonts)]
+            # Both issues already raised: the remaining pages can only change the reported font count
+            if len(all_fonts) > MAX_DISTINCT_FONTS and has_system and non_system_count > 5:
+                break
+        
+        # Too many different fonts suggests copy-paste manipulation
+        if len(all_fonts) > MAX_DISTINCT_FONTS:
+            issues.append(f"Excessive font variety: {len(all_fonts)} fonts detected")
+        
+        # Check for system fonts mixed with document fonts
+        if has_system and non_system_count > 5:
+            issues.append("Mixed system and custom fonts (potential manipulation)")
             
-            if has_system and len(non_system) > 5:
-                issues.append("Mixed system and custom fonts (potential manipulation)")
-                
     except Exception as e:
         logger.debug(f"Font check skipped: {e}")
     
     return len(issues) >= 1, issues
 
 
+def _open_pdf_reader(file_path: str):
+    """
+    pypdf reader shared by the PDF checks, or None if the file cannot be parsed
+    (each check then opens the file itself and reports the failure its own way).
+    """
+    try:
+        import pypdf
+        return pypdf.PdfReader(file_path, strict=False)
+    except Exception:
+        return None
+
+
 def forgery_check(file_path: str, extracted_text: str = None) -> Dict[str, Any]:
     """
     Main forgery detection function.
@@ -239,9 +310,12 @@ def forgery_check(file_path: str, extracted_text: str = None) -> Dict[str, Any]:
     checks_passed = 0
     checks_total = 0
     
+    # Parse the PDF once for the metadata and font checks
+    reader = _open_pdf_reader(file_path)
+    
     # 1. PDF Metadata check
     checks_total += 1
-    is_sus_meta, meta_issues = check_pdf_metadata(file_path)
+    is_sus_meta, meta_issues = check_pdf_metadata(file_path, reader)
     if is_sus_meta:
         all_issues.extend(meta_issues)
     else:
@@ -258,7 +332,7 @@ def forgery_check(file_path: str, extracted_text: str = None) -> Dict[str, Any]:
     
     # 3. Font anomalies check
     checks_total += 1
-    is_sus_font, font_issues = check_font_anomalies(file_path)
+    is_sus_font, font_issues = check_font_anomalies(file_path, reader)
     if is_sus_font:
         all_issues.extend(font_issues)
     else:
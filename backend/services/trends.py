@@ -39,7 +39,7 @@ class TrendService:
                 for file in files:
                     file_type = detect_file_type(file.filepath)
                     if file_type in ['xlsx', 'xls', 'csv']:
-                        parsed = parse_document(file.filepath)
+                        parsed = parse_document(file.filepath, include_markdown=False)
                         parsed_tables = parsed.get("tables", [])
                         for table in parsed_tables:
                             if isinstance(table, dict) and "data" in table:
@@ -0,0 +1,144 @@
+"""
+Unit tests for ChatbotService response handling.
+Uses a stub completion batcher so no OpenAI calls are made.
+"""
+
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.chatbot_service as chatbot_module
+from services.chatbot_service import ChatbotService
+
+
+class _StubBatcher:
+    def __init__(self, answer="Your KPI score is **80**."):
+        self.answer = answer
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.answer)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    batcher = _StubBatcher()
+    monkeypatch.setattr(chatbot_module, "OpenAIClient", lambda: None)
+    monkeypatch.setattr(chatbot_module, "get_completion_batcher", lambda: batcher)
+    return ChatbotService()
+
+
+def _context():
+    return {
+        "batch_id": "batch_test",
+        "mode": "aicte",
+        "kpi_results": {"fsr_score": {"name": "FSR Score", "value": 80.0}},
+        "block_data": {},
+        "block_summaries": {"faculty_information": {"present": True}},
+    }
+
+
+def test_repeated_query_served_from_cache(service):
+    first = service.generate_response("What is my KPI score?", _context(), "aicte")
+    second = service.generate_response("  what is my   KPI score? ", _context(), "aicte")
+
+    assert service.batcher.calls == 1
+    assert second == first
+    assert "KPI Results" in first["citations"]
+
+
+def test_cache_invalidated_when_context_changes(service):
+    service.generate_response("What is my KPI score?", _context(), "aicte")
+    changed = _context()
+    changed["kpi_results"]["fsr_score"]["value"] = 60.0
+    service.generate_response("What is my KPI score?", changed, "aicte")
+
+    assert service.batcher.calls == 2
+
+
+def test_stream_response_emits_deltas_then_done(service):
+    chunks = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+        for text in ["Your approval ", "readiness is ", None, "**75%**."]
+    ]
+    completions = SimpleNamespace(create=lambda **kwargs: iter(chunks))
+    service.ai_client = SimpleNamespace(client=SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+
+    events = list(service.stream_response("What is my approval readiness?", _context(), "aicte"))
+
+    assert [e.split("\n", 1)[0] for e in events] == ["event: delta"] * 3 + ["event: done"]
+    done = json.loads(events[-1].split("data: ", 1)[1])
+    assert done["answer"] == "Your approval readiness is **75%**."
+    assert "Approval Readiness" in done["citations"]
+
+
+def test_stream_response_reports_errors_like_generate_response(service):
+    def fail(**kwargs):
+        raise RuntimeError("Incorrect API key provided")
+
+    service.batcher.create = fail
+    service.ai_client = SimpleNamespace(
+        client=SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=fail)))
+    )
+
+    expected = service.generate_response("What is my KPI score?", _context(), "aicte")
+    events = list(service.stream_response("What is my KPI score?", _context(), "aicte"))
+
+    assert "authentication issue" in expected["answer"]
+    assert json.loads(events[-1].split("data: ", 1)[1]) == expected
+
+
+def test_extract_citations_matches_whole_words(service):
+    citations = service._extract_citations(
+        "your kpis are good, but two documents were flagged for compliance.", {}
+    )
+
+    assert citations == ["KPI Results", "Compliance Results", "Extracted Blocks"]
+    assert service._extract_citations("hello there.", {}) == ["Dashboard Data"]
+
+
+def test_build_context_drops_empty_fields(service):
+    batch = SimpleNamespace(
+        id="batch_test", mode="aicte", kpi_results=None, sufficiency_result=None,
+        compliance_results=None, approval_classification=None, approval_readiness=None,
+        trend_results=None,
+    )
+    block = SimpleNamespace(
+        block_type="faculty_information",
+        data={"faculty_count_num": 0, "hod_name": "", "departments": [], "extra": {"note": None}},
+        confidence=0.9, is_outdated=0, is_low_quality=0, is_invalid=0,
+        evidence_snippet=None, evidence_page=None, source_doc="faculty.pdf",
+    )
+
+    context = service.build_context(batch, [block])
+
+    assert context["block_data"]["faculty_information"] == {"faculty_count_num": 0}
+    summary = context["block_summaries"]["faculty_information"]
+    assert "evidence_snippet" not in summary and "evidence_page" not in summary
+    assert summary["is_outdated"] is False
+
+
+def test_fallback_prefers_kpi_then_approval(service):
+    context = _context()
+    context["approval_readiness"] = {"approval_readiness_score": 75, "approval_missing_documents": ["Fire NOC"]}
+
+    kpi = service._generate_fallback_response("approval readiness score?", context, "aicte")
+    assert kpi["citations"] == ["KPI Results"]
+    assert "**FSR Score**: 80.00" in kpi["answer"]
+
+    context["kpi_results"] = {}
+    approval = service._generate_fallback_response("approval readiness score?", context, "aicte")
+    assert approval["citations"] == ["Approval Readiness"]
+    assert "Fire NOC" in approval["answer"]
+
+    default = service._generate_fallback_response("hello", context, "aicte")
+    assert default["citations"] == []
+
@@ -0,0 +1,57 @@
+"""
+Tests for the request-coalescing completion batcher.
+Uses a stub async client so no OpenAI calls are made.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import ai.completion_batcher as completion_batcher
+from ai.completion_batcher import CompletionBatcher
+
+
+def _stub_client(create):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_synchronous_create_error_only_fails_its_caller():
+    batcher = CompletionBatcher("test-key")
+
+    async def answer(content):
+        return content
+
+    def create(**kwargs):
+        if "messages" not in kwargs:
+            raise TypeError("Missing required arguments")
+        return answer(kwargs["messages"])
+
+    batcher._client = _stub_client(create)
+
+    with pytest.raises(TypeError):
+        batcher.create(model="gpt-4o-mini")
+    assert batcher.create(model="gpt-4o-mini", messages="hello") == "hello"
+
+    # The real client rejects missing arguments before returning a coroutine as well
+    batcher._client = completion_batcher.openai.AsyncOpenAI(api_key="test-key")
+    with pytest.raises(TypeError):
+        batcher.create(model="gpt-4o-mini")
+
+
+def test_caller_stops_waiting_after_result_timeout(monkeypatch):
+    batcher = CompletionBatcher("test-key")
+
+    async def never_answers(**kwargs):
+        await asyncio.sleep(3600)
+
+    batcher._client = _stub_client(never_answers)
+    monkeypatch.setattr(completion_batcher, "RESULT_TIMEOUT_SECONDS", 0.2)
+
+    with pytest.raises(TimeoutError):
+        batcher.create(model="gpt-4o-mini", messages="hello")
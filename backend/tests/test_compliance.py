@@ -0,0 +1,99 @@
+"""
+Unit tests for ComplianceService flag generation.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.compliance as compliance_module
+from services.compliance import ComplianceService
+
+
+def _titles(flags):
+    return [flag["title"] for flag in flags]
+
+
+def test_aicte_missing_certificates_and_committees():
+    blocks = [
+        {
+            "block_type": "mandatory_committees_information",
+            "extracted_data": {"anti_ragging_committee": True},
+            "evidence_snippet": "",
+        }
+    ]
+
+    flags = ComplianceService().check_compliance("aicte", blocks)
+
+    assert _titles(flags) == [
+        "Missing or Invalid Fire NOC",
+        "Missing Building Stability Certificate",
+        "Missing Mandatory Committees",
+    ]
+    assert "ICC" in flags[-1]["reason"]
+    assert "Anti-Ragging" not in flags[-1]["reason"]
+
+
+def test_aicte_certificates_found_by_fuzzy_field_names_and_evidence():
+    blocks = [
+        {
+            "block_type": "safety_compliance_information",
+            "extracted_data": {"fire_noc": True, "building_stability_certificate": "Issued 2024"},
+            "evidence_snippet": "Sanitary certificate expired in 2022",
+        }
+    ]
+
+    flags = ComplianceService().check_compliance("AICTE", blocks)
+
+    assert _titles(flags) == ["Sanitary Certificate Expired"]
+
+
+def test_invalid_blocks_are_ignored_for_aggregation():
+    blocks = [
+        {
+            "block_type": "financial_information",
+            "extracted_data": {"annual_budget": "5 crore"},
+            "is_invalid": True,
+        },
+        {
+            "block_type": "regulatory_compliance",
+            "extracted_data": {"ugc_regulations_2018_compliance": True, "statutory_committees": ["IQAC"]},
+        },
+    ]
+
+    flags = ComplianceService().check_compliance("ugc", blocks)
+
+    assert flags == []
+    assert ComplianceService().check_compliance("unknown", blocks) == []
+
+
+def test_field_index_agrees_with_fuzzy_matching():
+    service = ComplianceService()
+    for name, categories in compliance_module.FIELD_TO_CATEGORIES.items():
+        for category, synonyms in compliance_module.COMPLIANCE_CATEGORIES.items():
+            assert (category in categories) == service._fuzzy_match(name, synonyms)
+    assert compliance_module.FIELD_TO_CATEGORIES["fire_safety_certificate_raw"] == {"fire_noc"}
+
+
+def test_repeated_runs_served_from_result_cache(monkeypatch):
+    blocks = [
+        {
+            "block_type": "mandatory_committees_information",
+            "extracted_data": {"icc_committee": True},
+            "evidence_snippet": "",
+        }
+    ]
+    service = ComplianceService()
+    first = service.check_compliance("aicte", blocks)
+    first[0]["title"] = "mutated"
+
+    calls = []
+    monkeypatch.setitem(ComplianceService._MODE_CHECKS, "aicte", lambda *args: calls.append(args) or [])
+    second = service.check_compliance("AICTE", blocks)
+
+    assert calls == []
+    assert second[0]["title"] == "Missing or Invalid Fire NOC"
+    assert service.check_compliance("aicte", blocks, use_cache=False) == []
+    assert len(calls) == 1
@@ -171,6 +171,84 @@ def test_mixed_data_excel():
                 pass
 
 
+def test_chunked_csv_matches_single_read(monkeypatch):
+    """Streaming a CSV in small chunks aggregates the same block data."""
+    import services.csv_block_mapper as mapper
+    
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+        f.write("faculty_count,phd_count,department\n")
+        for i in range(10):
+            f.write(f"{40 + i},{i},dept{i % 3}\n")
+        csv_path = f.name
+    
+    try:
+        single = map_csv_file(csv_path, mode="aicte")
+        monkeypatch.setattr(mapper, "CSV_CHUNK_ROWS", 3)
+        chunked = map_csv_file(csv_path, mode="aicte")
+        
+        assert chunked == single
+        assert chunked[0]["data"]["faculty_count_num"] == 49.0
+    finally:
+        os.unlink(csv_path)
+
+
+def test_numeric_columns_reduced_like_row_merge():
+    """Column-wise reduction of numeric columns matches the row-by-row merge, key order included."""
+    import services.csv_block_mapper as mapper
+    
+    df = pd.DataFrame({
+        "remarks": [None, "ok", None, "AY 2021-22"],
+        "phd_count": [3.0, None, 9.0, 4.0],
+        "publications": [None, 7, 5, 6],
+        "faculty": [40, 42, 41, 44],
+        "accredited": [True, False, True, True],
+    })
+    columns = mapper.prepare_columns(df.columns)
+    
+    assert mapper.plain_numeric_columns(df, columns, "faculty_information") == [1, 2, 4]
+    for block_type in ["faculty_information", "generic_data"]:
+        reduced = mapper.aggregate_rows(df, columns, block_type, {"academic_year": "2021-22"})
+        rows = zip(*(mapper.parse_column(df[col.label]) for col in columns))
+        merged = mapper.merge_rows(rows, columns, block_type, {"academic_year": "2021-22"})
+        
+        assert reduced == merged
+        assert list(reduced) == list(merged)
+    assert reduced["phd_count_num"] == 9.0 and reduced["publications"] == 6
+
+
+def test_streamed_xlsx_matches_pandas_sheet(monkeypatch):
+    """Streaming .xlsx rows with openpyxl maps like the pd.read_excel path."""
+    import services.csv_block_mapper as mapper
+    from openpyxl import Workbook
+    
+    with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as f:
+        excel_path = f.name
+    
+    try:
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "Faculty"
+        sheet.append(["faculty_count", "phd_count", None, "phd_count"])
+        sheet.append([45, "N/A", "note", 3])
+        sheet.append([None, None, None, None])
+        sheet.append([48, 12, "#DIV/0!", "5 lakh"])
+        workbook.create_sheet("Empty")
+        workbook.save(excel_path)
+    
+        blocks = map_excel_file(excel_path, mode="aicte")
+        expected = mapper.map_excel_sheet(pd.read_excel(excel_path, sheet_name="Faculty"), "Faculty", excel_path)
+    
+        assert blocks == [expected]
+        assert blocks[0]["data"]["faculty_count_num"] == 48.0
+        assert blocks[0]["data"]["phd_count_1_num"] == 500000.0
+        assert "unnamed:_2" in blocks[0]["data"]
+        
+        monkeypatch.setattr(mapper, "OPENPYXL_AVAILABLE", False)
+        assert map_excel_file(excel_path, mode="aicte") == blocks
+    finally:
+        os.unlink(excel_path)
+
+
 def run_all_tests():
     """Run all CSV/Excel mapping tests."""
     print("=" * 60)
@@ -0,0 +1,345 @@
+"""
+Tests for PDF/Excel/CSV/Word document parsing helpers.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import pypdf
+import pytest
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.docling_service as docling_module
+import services.document_parser as parser_module
+import utils.parse_cache as parse_cache
+
+REPO_ROOT = Path(__file__).parent.parent.parent
+
+
+@pytest.fixture(autouse=True)
+def private_parse_cache(monkeypatch, tmp_path):
+    """Per-test parse cache at an absolute path, so no test writes into the working tree."""
+    monkeypatch.setattr(parse_cache.settings, "PARSE_CACHE_DIR", str(tmp_path / "storage" / "parse_cache"))
+
+
+def test_parallel_page_extraction_keeps_page_order(monkeypatch):
+    pdf = str(REPO_ROOT / "Overall.pdf")
+    reader = pypdf.PdfReader(pdf)
+    serial = [page.extract_text() for page in reader.pages]
+
+    monkeypatch.setattr(docling_module.os, "cpu_count", lambda: 3)
+    parallel = docling_module.extract_page_texts(reader, pdf)
+
+    assert len(serial) >= docling_module.PARALLEL_PAGE_THRESHOLD
+    assert parallel == serial
+
+
+def test_page_extraction_serial_inside_pool_worker(monkeypatch):
+    pdf = str(REPO_ROOT / "Overall.pdf")
+    reader = pypdf.PdfReader(pdf)
+    serial = [page.extract_text() for page in reader.pages]
+
+    def no_nested_pool():
+        raise AssertionError("a pool worker must not start its own pool")
+
+    monkeypatch.setattr(docling_module.os, "cpu_count", lambda: 3)
+    monkeypatch.setattr(docling_module.multiprocessing, "parent_process", lambda: object())
+    monkeypatch.setattr(docling_module, "get_process_pool", no_nested_pool)
+
+    assert docling_module.extract_page_texts(reader, pdf) == serial
+
+
+def test_pdf_parser_reuses_docling_converter(monkeypatch, tmp_path):
+    created = []
+
+    class FakeConverter:
+        def __init__(self):
+            created.append(self)
+
+        def convert(self, file_path):
+            document = types.SimpleNamespace(export_to_markdown=lambda: f"text of {Path(file_path).name}", tables=[])
+            return types.SimpleNamespace(document=document, num_pages=1)
+
+    fake_module = types.ModuleType("docling.document_converter")
+    fake_module.DocumentConverter = FakeConverter
+    monkeypatch.setitem(sys.modules, "docling.document_converter", fake_module)
+    monkeypatch.setattr(parser_module, "_converter", None)
+
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    texts = [parser_module.parse_pdf_document(str(pdf))["text"] for _ in range(3)]
+
+    assert texts == ["text of a.pdf"] * 3
+    assert len(created) == 1
+
+
+def test_csv_rows_rendered_like_iterrows(tmp_path):
+    csv = tmp_path / "faculty.csv"
+    csv.write_text("department,faculty_count,phd_ratio\nCSE,45,0.5\nECE,,0.25\n")
+
+    parsed = parser_module.parse_csv_document(str(csv))
+    lines = parsed["text"].split("\n")
+
+    assert "Row 1: department=CSE, faculty_count=45.0, phd_ratio=0.5" in lines
+    assert "Row 2: department=ECE, phd_ratio=0.25" in lines
+    assert lines[-2:] == ["| CSE | 45.0 | 0.5 |", "| ECE |  | 0.25 |"]
+    assert parsed["tables"][0]["data"][1]["faculty_count"] == ""
+    assert parsed["tables"][0]["data"][-1:] == [{"department": "ECE", "faculty_count": "", "phd_ratio": 0.25}]
+    assert list(parsed["tables"][0]["data"]) == [{"department": "CSE", "faculty_count": 45.0, "phd_ratio": 0.5}] + parsed["tables"][0]["data"][1:]
+
+
+def test_detect_file_type_cache_follows_file_changes(tmp_path):
+    upload = tmp_path / "upload.xlsx"
+    upload.write_bytes(b"%PDF-1.7 scanned")
+    assert parser_module.detect_file_type(str(upload)) == "pdf"
+    assert parser_module.detect_file_type(str(upload)) == "pdf"
+
+    upload.write_bytes(b"PK\x03\x04 zipped workbook")
+    assert parser_module.detect_file_type(str(upload)) == "xlsx"
+    assert parser_module.detect_file_type(str(tmp_path / "missing.docx")) == "docx"
+
+
+def _docling_service_with_items(items):
+    service = docling_module.DoclingService()
+    document = types.SimpleNamespace(items=items)
+    service.converter = types.SimpleNamespace(convert=lambda filepath: types.SimpleNamespace(document=document))
+    service.docling_available = True
+    return service
+
+
+def test_docling_items_grouped_into_sections(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    table = types.SimpleNamespace(rows=[
+        types.SimpleNamespace(cells=[types.SimpleNamespace(text="Faculty"), types.SimpleNamespace(text=None)]),
+        types.SimpleNamespace(cells=["45"]),
+    ])
+    items = [
+        types.SimpleNamespace(text="  Preamble "),
+        types.SimpleNamespace(text="Faculty", level=2, page=3),
+        types.SimpleNamespace(text="   ", table=table),
+        types.SimpleNamespace(text="45 members", page=None),
+    ]
+
+    result = _docling_service_with_items(items).parse_pdf_to_structured_text(str(REPO_ROOT / "sample.pdf"))
+
+    assert result["full_text"] == "Preamble\n\nFaculty\n\n\n[TABLE]\nFaculty | \n45\n[/TABLE]\n\n\n45 members"
+    assert result["tables_text"] == "Faculty | \n45"
+    assert result["sections"] == [
+        {"title": "Introduction", "level": 1, "page": 1, "content": ["Preamble"]},
+        {"title": "Faculty", "level": 2, "page": 1, "content": ["45 members"]},
+    ]
+    assert result["section_chunks"][1] == {"title": "Faculty", "level": 2, "page": 1, "text": "45 members"}
+    assert result["page_count"] == 3
+
+
+def test_debug_dumps_written_in_background_unless_disabled(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    service = _docling_service_with_items([types.SimpleNamespace(text="Heading", level=1)])
+
+    service.parse_pdf_to_structured_text(str(REPO_ROOT / "sample.pdf"))
+    docling_module._DEBUG_WRITER.submit(lambda: None).result()
+
+    debug_dir = tmp_path / "storage" / "debug"
+    assert (debug_dir / "sample_full_text_docling.txt").read_text(encoding="utf-8") == "Heading"
+    assert '"title": "Heading"' in (debug_dir / "sample_sections_docling.json").read_text(encoding="utf-8")
+
+    monkeypatch.setattr(docling_module.settings, "DOCLING_DEBUG_FILES", False)
+    docling_module.queue_debug_files({"skipped.txt": "x"}, "test")
+    docling_module._DEBUG_WRITER.submit(lambda: None).result()
+    assert not (debug_dir / "skipped.txt").exists()
+
+
+def test_corrupted_pdf_rejected_before_docling(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    service = _docling_service_with_items([])
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf at all")
+    trailing = tmp_path / "trailing.pdf"
+    trailing.write_bytes((REPO_ROOT / "sample.pdf").read_bytes() + b"\0" * 4096)
+
+    assert docling_module.looks_like_pdf(str(REPO_ROOT / "sample.pdf"))
+    assert docling_module.looks_like_pdf(docling_module.read_pdf_bytes(str(REPO_ROOT / "sample.pdf")))
+    assert not docling_module.looks_like_pdf(str(trailing))
+    assert service.parse_pdf_to_structured_text(str(broken))["error"] == "Invalid or corrupted PDF file"
+    assert "error" not in service.parse_pdf_to_structured_text(str(trailing))
+
+
+def test_table_text_and_dict_share_cell_walk():
+    service = _docling_service_with_items([])
+    table = types.SimpleNamespace(rows=[
+        types.SimpleNamespace(cells=[types.SimpleNamespace(text="Intake"), types.SimpleNamespace(text=None), 120]),
+        types.SimpleNamespace(),
+    ])
+
+    assert service._table_to_text(table) == "Intake |  | 120\n"
+    assert service._table_to_dict(table) == {"rows": [["Intake", "", "120"], []], "row_count": 2, "column_count": 3}
+    assert service._table_to_dict(types.SimpleNamespace(rows=None)) == {"rows": [], "row_count": 0, "column_count": 0}
+
+
+def test_docling_table_records_without_dataframe():
+    def grid_table(rows, header_rows):
+        grid = [
+            [types.SimpleNamespace(text=text, column_header=i < header_rows) for text in row]
+            for i, row in enumerate(rows)
+        ]
+        return types.SimpleNamespace(data=types.SimpleNamespace(num_rows=len(rows), num_cols=len(rows[0]), grid=grid))
+
+    headed = grid_table([["Faculty", "Faculty"], ["", "PhD"], ["45", "12"]], header_rows=2)
+    assert parser_module._docling_table_records(headed) == [{"Faculty.": "45", "Faculty.PhD": "12"}]
+    assert parser_module._docling_table_records(grid_table([["a", "b"]], header_rows=0)) == [{0: "a", 1: "b"}]
+
+
+def test_pdf_read_once_for_validation_and_fallback(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    reads = []
+    read_pdf_bytes = docling_module.read_pdf_bytes
+    monkeypatch.setattr(docling_module, "read_pdf_bytes", lambda path: reads.append(path) or read_pdf_bytes(path))
+    service = _docling_service_with_items([])
+
+    def failing_convert(source):
+        raise RuntimeError("layout model crashed")
+
+    service.converter = types.SimpleNamespace(convert=failing_convert)
+    result = service.parse_pdf_to_structured_text(str(REPO_ROOT / "sample.pdf"))
+
+    assert result["page_count"] == 3 and "[Page 1]" in result["full_text"]
+    assert reads == [str(REPO_ROOT / "sample.pdf")]
+
+
+def test_docling_timeout_returns_without_waiting_for_conversion(monkeypatch, tmp_path):
+    import threading
+    import time
+
+    monkeypatch.chdir(tmp_path)
+    release = threading.Event()
+    service = _docling_service_with_items([])
+    service.converter = types.SimpleNamespace(convert=lambda filepath: release.wait(5))
+    monkeypatch.setattr(docling_module, "DOCLING_TIMEOUT_SECONDS", 0.2)
+
+    started = time.perf_counter()
+    try:
+        result = service.parse_pdf_to_structured_text(str(REPO_ROOT / "sample.pdf"))
+    finally:
+        release.set()
+
+    assert time.perf_counter() - started < 3
+    assert result["page_count"] == 3 and "error" not in result
+
+
+def test_fallback_results_not_cached(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    pdf = str(REPO_ROOT / "sample.pdf")
+    service = _docling_service_with_items([types.SimpleNamespace(text="Docling text")])
+    healthy = service.converter
+
+    def failing_convert(source):
+        raise RuntimeError("all conversion threads busy")
+
+    service.converter = types.SimpleNamespace(convert=failing_convert)
+    fallback = service.parse_pdf_to_structured_text(pdf)
+    service.converter = healthy
+
+    assert fallback["fallback"] is True and "[Page 1]" in fallback["full_text"]
+    assert service.parse_pdf_to_structured_text(pdf)["full_text"] == "Docling text"
+
+    # parse_document: a PyPDF2 stand-in for a failed Docling conversion is retried as well
+    converter = types.SimpleNamespace(convert=failing_convert)
+    monkeypatch.setattr(parser_module, "_get_converter", lambda: converter)
+    monkeypatch.setattr(parser_module, "PyPDF2", pypdf, raising=False)  # same PdfReader API
+    monkeypatch.setattr(parser_module, "PYPDF2_AVAILABLE", True)
+    assert parser_module.parse_document(pdf)["meta"]["fallback"] is True
+    document = types.SimpleNamespace(export_to_markdown=lambda: "Docling markdown", tables=[])
+    converter.convert = lambda file_path: types.SimpleNamespace(document=document, num_pages=3)
+    assert parser_module.parse_document(pdf)["meta"] == {"parser": "docling", "pages": 3}
+
+
+def test_parse_results_cached_until_file_changes(monkeypatch, tmp_path):
+    import os
+
+    monkeypatch.chdir(tmp_path)
+    calls = []
+    csv = tmp_path / "intake.csv"
+    csv.write_text("intake\n120\n")
+    parse_csv = parser_module.parse_csv_document
+    monkeypatch.setattr(parser_module, "parse_csv_document", lambda path, **kwargs: calls.append(path) or parse_csv(path, **kwargs))
+
+    first = parser_module.parse_document(str(csv))
+    first["text"] = "mutated"
+    second = parser_module.parse_document(str(csv))
+    assert len(calls) == 1
+    assert "Row 1: intake=120" in second["text"]
+
+    csv.write_text("intake\n180\n")
+    os.utime(csv, ns=(0, 10**18))
+    assert "Row 1: intake=180" in parser_module.parse_document(str(csv))["text"]
+    assert len(calls) == 2
+    cache_dir = tmp_path / "storage" / "parse_cache"
+    assert len(list(cache_dir.glob("*.pkl"))) == 2
+
+    # Results from an older parser build are not served
+    monkeypatch.setattr(parse_cache, "PARSE_CACHE_VERSION", parse_cache.PARSE_CACHE_VERSION + 1)
+    parser_module.parse_document(str(csv))
+    assert len(calls) == 3
+
+    parse_cache.evict_parse_cache(cache_dir, max_bytes=1)
+    assert list(cache_dir.glob("*.pkl")) == []
+
+
+def test_parse_documents_keeps_input_order_across_workers(monkeypatch, tmp_path):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # The test's cache dir reaches a pool spawned here through the environment
+    # (the shared pool's workers keep the cwd and settings they started with)
+    cache_dir = Path(parse_cache.settings.PARSE_CACHE_DIR)
+    monkeypatch.setenv("PARSE_CACHE_DIR", str(cache_dir))
+    paths = []
+    for i, suffix in enumerate([".csv", ".docx", ".csv", ".txt"]):
+        path = tmp_path / f"upload{i}{suffix}"
+        if suffix == ".docx":
+            import docx
+            document = docx.Document()
+            document.add_paragraph("Institution profile")
+            document.save(path)
+        else:
+            path.write_text(f"intake\n{100 + i}\n")
+        paths.append(str(path))
+
+    expected = [parser_module.parse_document(path) for path in paths]
+    for entry in cache_dir.iterdir():
+        entry.unlink()
+    parser_module.parse_document(paths[0])  # only the first upload is cached
+
+    assert parser_module.parse_documents(paths) == expected  # small batch: parsed in-process
+    for entry in cache_dir.iterdir():
+        entry.unlink()
+    parser_module.parse_document(paths[0])
+
+    pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+    monkeypatch.setattr(parser_module, "get_process_pool", lambda: pool)
+    monkeypatch.setattr(parser_module, "PARALLEL_PARSE_MIN_BYTES", 0)
+    monkeypatch.setattr(parser_module.os, "cpu_count", lambda: 2)
+    try:
+        assert parser_module.parse_documents(paths) == expected
+        assert parser_module.parse_documents(paths[:1] + [str(tmp_path / "missing.csv")])[1]["meta"] == {"error": "File not found"}
+    finally:
+        pool.shutdown()
+    # The workers' results landed here too (all but the unsupported .txt upload)
+    assert len(list(cache_dir.glob("*.pkl"))) == sum("error" not in parsed["meta"] for parsed in expected)
+
+
+def test_markdown_tables_optional(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    csv = tmp_path / "intake.csv"
+    csv.write_text("program,intake\nCSE,120\n")
+
+    full = parser_module.parse_document(str(csv))
+    text_only = parser_module.parse_document(str(csv), include_markdown=False)
+
+    assert "--- TABLE: CSV Data ---" in full["text"]
+    assert text_only["text"] == full["text"].split("\n\n--- TABLE")[0]
+    assert text_only["tables"] == full["tables"]
+    assert parser_module.parse_documents([str(csv)], include_markdown=False) == [text_only]
@@ -0,0 +1,114 @@
+"""
+Tests for evidence search over stored blocks.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.evidence_search as evidence_search
+from config.database import Base, Block
+
+
+@pytest.fixture
+def block_db(monkeypatch, tmp_path):
+    """Private SQLite database holding a few blocks; yields (session factory, query counter)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'blocks.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([
+            Block(id="b1", batch_id="batch-1", block_type="infrastructure", confidence=0.9,
+                  data={"fire_noc": "Valid till 2026", "labs": [{"name": "Fire safety lab", "area": "120"}]},
+                  evidence_snippet="Fire NOC issued", evidence_page=4, source_doc="infra.pdf"),
+            Block(id="b2", batch_id="batch-1", block_type="faculty", confidence=0.7,
+                  data={"faculty_count": 45, "remarks": "N/A"}, source_doc="faculty.pdf"),
+            Block(id="b3", batch_id="batch-2", block_type="faculty", confidence=0.95,
+                  data={"faculty_count": 80}),
+        ])
+        db.commit()
+
+    sessions = []
+    monkeypatch.setattr(evidence_search, "get_db", lambda: sessions.append(1) or Session())
+    yield Session, sessions
+
+
+def test_best_evidence_prefers_exact_key(block_db):
+    evidence = evidence_search.find_best_evidence("batch-1", ["fire_noc", "fire_safety"])
+
+    assert evidence == {
+        "value": "Valid till 2026",
+        "snippet": "Fire NOC issued",
+        "page": 4,
+        "source_doc": "infra.pdf",
+        "confidence": 0.9,
+        "match_type": "block_key_exact",
+    }
+    assert evidence_search.find_best_evidence("batch-1", ["fire safety"])["match_type"] == "table_cell_match"
+    assert evidence_search.find_best_evidence("batch-1", ["naac_grade"]) is None
+
+
+def test_batch_search_fetches_blocks_once_per_call(block_db):
+    Session, sessions = block_db
+
+    results = evidence_search.find_best_evidence_batch(
+        "batch-1", {"faculty": ["faculty_count"], "fire": ["fire_noc"]}
+    )
+    assert results["faculty"]["value"] == 45
+    assert results["fire"]["value"] == "Valid till 2026"
+    assert len(sessions) == 1
+
+    with Session() as db:
+        db.query(Block).filter(Block.id == "b2").update({"data": {"faculty_count": 50}})
+        db.commit()
+    assert evidence_search.find_best_evidence("batch-1", ["faculty_count"])["value"] == 50
+    assert len(sessions) == 2
+
+
+def test_block_examined_checks_requested_types(block_db):
+    Session, _ = block_db
+    with Session() as db:
+        db.add(Block(id="b4", batch_id="batch-2", block_type="placement", data=["not", "a", "dict"]))
+        db.add(Block(id="b5", batch_id="batch-2", block_type="library", data=None))
+        db.commit()
+
+    assert evidence_search.check_block_examined("batch-1", ["accreditation", "faculty"])
+    assert not evidence_search.check_block_examined("batch-1", ["accreditation"])
+    assert not evidence_search.check_block_examined("batch-2", ["placement"])
+    assert evidence_search.check_block_examined("batch-2", ["library"])
+    assert not evidence_search.check_block_examined("batch-2", [])
+
+
+def test_best_evidence_stops_at_near_certain_match(block_db):
+    Session, _ = block_db
+    with Session() as db:
+        db.add(Block(id="b6", batch_id="batch-3", block_type="accreditation", confidence=0.97, data={"naac_grade": "A"}))
+        db.add(Block(id="b7", batch_id="batch-3", block_type="accreditation", confidence=1.0, data={"naac_grade": "A+"}))
+        db.commit()
+
+    assert evidence_search.find_best_evidence("batch-3", ["naac_grade"])["value"] == "A"
+    assert evidence_search.find_best_evidence("batch-3", ["naac_grade"], early_exit_confidence=1.01)["value"] == "A+"
+
+
+def test_batch_search_matches_single_key_searches(block_db):
+    key_groups = {
+        "fire_noc": ["fire_noc", "fire_safety"],
+        "fire_lab": ["fire safety"],
+        "faculty": ["faculty_count"],
+        "naac": ["naac_grade"],
+        "none": [],
+    }
+
+    results = evidence_search.find_best_evidence_batch("batch-1", key_groups)
+
+    assert list(results) == list(key_groups)
+    for key, aliases in key_groups.items():
+        assert results[key] == evidence_search.find_best_evidence("batch-1", aliases)
+    assert results["fire_lab"]["match_type"] == "table_cell_match"
+    assert results["naac"] is None and results["none"] is None
@@ -0,0 +1,124 @@
+"""
+Tests for document forgery detection checks.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.forgery_detection as forgery
+
+
+def test_text_anomalies_flag_patterns_and_repeated_numbers():
+    text = "Intake 2024 for 2024 batch, 2024 again. [INSERT NAME] " + "Fee 125000 " * 6
+
+    is_suspicious, issues = forgery.check_text_anomalies(text)
+
+    assert is_suspicious
+    assert issues == [
+        f"Suspicious pattern found: {forgery.SUSPICIOUS_PATTERNS[0][:30]}...",
+        f"Suspicious pattern found: {forgery.SUSPICIOUS_PATTERNS[3][:30]}...",
+        "Number '125000' repeated 6 times",
+    ]
+    assert forgery.check_text_anomalies("Faculty strength: 45") == (False, [])
+
+
+def test_ocr_mismatch_counts_repeated_words():
+    docling_text = "Total intake 120 students total intake 120"
+    same_words_once = "total intake 120 students"
+
+    is_suspicious, message = forgery.check_text_ocr_mismatch(docling_text, same_words_once)
+
+    assert is_suspicious and message == "Text-to-OCR mismatch: 42.9% (threshold: 40%)"
+    assert forgery.check_text_ocr_mismatch(docling_text, docling_text.upper()) == (False, "Text-to-OCR match: 100.0%")
+    assert forgery.check_text_ocr_mismatch("a", "") == (False, "Insufficient text for comparison")
+
+
+def test_pdf_metadata_flags_suspicious_producer(tmp_path):
+    import pypdf
+
+    writer = pypdf.PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    writer.add_metadata({"/Producer": "iLovePDF 2.1", "/Creator": ""})
+    pdf = tmp_path / "merged.pdf"
+    with open(pdf, "wb") as f:
+        writer.write(f)
+
+    is_suspicious, issues = forgery.check_pdf_metadata(str(pdf))
+
+    assert is_suspicious
+    assert issues == ["Suspicious PDF producer detected: ilovepdf 2.1", "Missing/unknown document creator"]
+
+
+def test_letter_counts_match_per_character_loop():
+    ascii_text = "Intake: 120 Students, [B.Tech] @ `CSE` {2021-22} " * 40
+    latin = "Intake: 120 Students, ÉCOLE d'ingénieurs " * 40
+    cjk = "".join(chr(0x4E00 + i) for i in range(forgery._MAX_SCANNED_LETTERS + 1)) * 3 + "abc 123"
+
+    for text in (ascii_text.lower(), ascii_text, latin.lower(), cjk):
+        expected = {}
+        for char in text:
+            if char.isalpha():
+                expected[char] = expected.get(char, 0) + 1
+        assert forgery._letter_counts(text) == expected
+
+    uniform = "".join(chr(97 + i % 26) for i in range(2600))
+    assert "Suspiciously uniform character distribution" in forgery.check_text_anomalies(uniform)[1]
+
+
+def _write_font_pdf(path, page_fonts):
+    """PDF whose pages each reference the given base font names, one indirect font object apiece."""
+    from pypdf import PdfWriter
+    from pypdf.generic import DictionaryObject, NameObject
+
+    writer = PdfWriter()
+    for names in page_fonts:
+        page = writer.add_blank_page(width=200, height=200)
+        fonts = DictionaryObject()
+        for i, name in enumerate(names):
+            font = DictionaryObject({
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/BaseFont"): NameObject(f"/{name}"),
+            })
+            fonts[NameObject(f"/F{i}")] = writer._add_object(font)
+        page[NameObject("/Resources")] = DictionaryObject({NameObject("/Font"): fonts})
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+
+def test_font_check_stops_once_font_limit_exceeded(tmp_path):
+    custom = [[f"Custom{page_num}-{i}" for i in range(8)] for page_num in range(4)]
+
+    # Both issues are settled after two pages, so the last two are never read
+    pdf = _write_font_pdf(tmp_path / "mixed.pdf", [["Arial"] + custom[0], *custom[1:]])
+    assert forgery.check_font_anomalies(pdf) == (True, [
+        "Excessive font variety: 17 fonts detected",
+        "Mixed system and custom fonts (potential manipulation)",
+    ])
+
+    # A system font on a later page still counts once the font limit is exceeded
+    pdf = _write_font_pdf(tmp_path / "late_system.pdf", [custom[0], custom[1], ["Helvetica"]])
+    assert forgery.check_font_anomalies(pdf) == (True, [
+        "Excessive font variety: 17 fonts detected",
+        "Mixed system and custom fonts (potential manipulation)",
+    ])
+
+
+def test_forgery_check_parses_pdf_once(monkeypatch):
+    import pypdf
+
+    opened = []
+    reader_cls = pypdf.PdfReader
+    monkeypatch.setattr(
+        pypdf, "PdfReader", lambda stream, **kwargs: opened.append(stream) or reader_cls(stream, **kwargs)
+    )
+    pdf = str(Path(__file__).parent.parent.parent / "sample.pdf")
+
+    result = forgery.forgery_check(pdf, "Faculty strength: 45")
+
+    assert opened == [pdf]
+    assert result["checks_total"] == 3
+    assert not any("Could not read PDF metadata" in issue for issue in result["issues"])
@@ -0,0 +1,119 @@
+"""
+On-disk cache of document parse results
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Part of every cache key: bump whenever any cached parser's output changes, so results
+# written by older builds are never served (their files then age out through LRU eviction)
+PARSE_CACHE_VERSION = 1
+
+
+def parse_cache_path(namespace: str, file_path: str, st: os.stat_result) -> Path:
+    """
+    Cache file for one parser's result on one version (path, mtime, size) of a file,
+    as produced by parser code at PARSE_CACHE_VERSION.
+    """
+    identity = f"{PARSE_CACHE_VERSION}:{namespace}:{os.path.abspath(file_path)}:{st.st_mtime_ns}:{st.st_size}"
+    key = hashlib.blake2b(identity.encode("utf-8"), digest_size=16).hexdigest()
+    return Path(settings.PARSE_CACHE_DIR) / f"{key}.pkl"
+
+
+def load_parse_result(cache_path: Path) -> Optional[Dict[str, Any]]:
+    """Return the cached result, or None on a miss or an unreadable entry."""
+    try:
+        with open(cache_path, "rb") as f:
+            result = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable parse cache entry {cache_path.name}: {e}")
+        return None
+
+    try:
+        os.utime(cache_path)  # mtime marks recent use for eviction
+    except OSError:
+        pass
+    return result
+
+
+def store_parse_result(cache_path: Path, result: Dict[str, Any]) -> None:
+    """Write the result atomically, then trim the cache to PARSE_CACHE_MAX_BYTES."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        evict_parse_cache(cache_path.parent, settings.PARSE_CACHE_MAX_BYTES)
+    except Exception as e:
+        logger.warning(f"Failed to write parse cache entry {cache_path.name}: {e}")
+
+
+def evict_parse_cache(cache_dir: Path, max_bytes: int) -> None:
+    """Delete least recently used entries until the cache fits in max_bytes."""
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".pkl"):
+            st = entry.stat()
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def peek_parse_result(namespace: str, file_path: str) -> Optional[Dict[str, Any]]:
+    """Return the stored result for the file as it is now, without parsing on a miss."""
+    if settings.PARSE_CACHE_MAX_BYTES <= 0:
+        return None
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return load_parse_result(parse_cache_path(namespace, file_path, st))
+
+
+def cached_parse(namespace: str, file_path: str, parse: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Return parse(file_path), reusing the stored result while the file is unchanged.
+    Results carrying an "error" or a "fallback" flag (top level or in "meta") are not stored:
+    failures, and stand-ins produced after the primary parser failed, get retried.
+    """
+    if settings.PARSE_CACHE_MAX_BYTES <= 0:
+        return parse(file_path)
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return parse(file_path)
+
+    cache_path = parse_cache_path(namespace, file_path, st)
+    result = load_parse_result(cache_path)
+    if result is not None:
+        return result
+
+    result = parse(file_path)
+    meta = result.get("meta", {})
+    if not any(flag in result or flag in meta for flag in ("error", "fallback")):
+        store_parse_result(cache_path, result)
+    return result
@@ -7,6 +7,31 @@ Handles: ₹, commas, LPA/Lakhs, percentages, area units
 import re
 from typing import Optional, Union
 
+# Unadorned number, optionally with thousands separators
+_PLAIN_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?|\d{1,3}(?:,\d{3})+(?:\.\d+)?')
+
+# Fallback patterns, compiled once instead of looked up in re's cache on every call
+_PERCENT_RE = re.compile(r'(\d+\.?\d*)\s*%', re.IGNORECASE)
+_LPA_RE = re.compile(r'(\d+\.?\d*)\s*(?:LPA|lpa|L\.P\.A\.)', re.IGNORECASE)
+_LAKH_RE = re.compile(r'(\d+\.?\d*)\s*(?:lakh|lakhs|L|Lakh|Lakhs)', re.IGNORECASE)
+_CRORE_RE = re.compile(r'(\d+\.?\d*)\s*(?:crore|crores|Cr|Crore|Crores)', re.IGNORECASE)
+_CURRENCY_RES = [
+    re.compile(r'[₹]\s*(\d+[,\d]*\.?\d*)', re.IGNORECASE),  # ₹85,000
+    re.compile(r'Rs\.?\s*(\d+[,\d]*\.?\d*)', re.IGNORECASE),  # Rs. 85000 or Rs 85000
+    re.compile(r'INR\s*(\d+[,\d]*\.?\d*)', re.IGNORECASE),  # INR 85000
+]
+_AREA_SQM_RE = re.compile(r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(?:sq\.?\s*m|sqm|square\s*(?:meter|metre|m))', re.IGNORECASE)
+_AREA_SQFT_RE = re.compile(r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(?:sq\.?\s*ft|sqft|square\s*(?:feet|ft))', re.IGNORECASE)
+_ACRES_RE = re.compile(r'(\d+\.?\d*)\s*(?:acre|acres|ac\.?)', re.IGNORECASE)
+_HECTARES_RE = re.compile(r'(\d+\.?\d*)\s*(?:hectare|hectares|ha\.?)', re.IGNORECASE)
+_NOISE_WORDS_RE = re.compile(
+    r'\b(students|student|FTE|fte|sq\.?\s*ft|square\s*(?:feet|ft)|area|count|number|total|per|each)\b',
+    re.IGNORECASE
+)
+_FIRST_NUMBER_RE = re.compile(r'(\d+(?:,\d{3})*(?:\.\d+)?)')
+_ANY_NUMBER_RE = re.compile(r'\d+\.?\d*')
+
+
 def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
     """
     Extract numeric value from messy string.
@@ -36,8 +61,12 @@ def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
     if not cleaned:
         return None
     
+    # Fast path: plain number "85000", "84.7" or "85,000" (what Pattern 7 would return)
+    if _PLAIN_NUMBER_RE.fullmatch(cleaned):
+        return float(cleaned.replace(',', ''))
+    
     # Pattern 1: Percentage "84.7%" → 84.7
-    percent_match = re.search(r'(\d+\.?\d*)\s*%', cleaned, re.IGNORECASE)
+    percent_match = _PERCENT_RE.search(cleaned)
     if percent_match:
         try:
             return float(percent_match.group(1))
@@ -45,7 +74,7 @@ def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
             pass
     
     # Pattern 2: LPA "4.2 LPA" → 4.2 (LPA value; caller may convert to INR)
-    lpa_match = re.search(r'(\d+\.?\d*)\s*(?:LPA|lpa|L\.P\.A\.)', cleaned, re.IGNORECASE)
+    lpa_match = _LPA_RE.search(cleaned)
     if lpa_match:
         try:
             return float(lpa_match.group(1))
@@ -53,7 +82,7 @@ def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
             pass
     
     # Pattern 3: Lakh "X lakh" → X * 100000
-    lakh_match = re.search(r'(\d+\.?\d*)\s*(?:lakh|lakhs|L|Lakh|Lakhs)', cleaned, re.IGNORECASE)
+    lakh_match = _LAKH_RE.search(cleaned)
     if lakh_match:
         try:
             num = float(lakh_match.group(1))
@@ -62,7 +91,7 @@ def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
             pass
     
     # Pattern 4: Crore "X crore" → X * 10000000
-    crore_match = re.search(r'(\d+\.?\d*)\s*(?:crore|crores|Cr|Crore|Crores)', cleaned, re.IGNORECASE)
+    crore_match = _CRORE_RE.search(cleaned)
     if crore_match:
         try:
             num = float(crore_match.group(1))
@@ -71,13 +100,8 @@ def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
             pass
     
     # Pattern 5: Currency symbols (₹, Rs., INR) followed by number
-    currency_patterns = [
-        r'[₹]\s*(\d+[,\d]*\.?\d*)',  # ₹85,000
-        r'Rs\.?\s*(\d+[,\d]*\.?\d*)',  # Rs. 85000 or Rs 85000
-        r'INR\s*(\d+[,\d]*\.?\d*)',  # INR 85000
-    ]
-    for pattern in currency_patterns:
-        currency_match = re.search(pattern, cleaned, re.IGNORECASE)
+    for pattern in _CURRENCY_RES:
+        currency_match = pattern.search(cleaned)
         if currency_match:
             try:
                 num_str = currency_match.group(1).replace(',', '')
@@ -87,7 +111,7 @@ def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
     
     # Pattern 6: Area units with conversion
     # Square meters: "18,500 sq. m" or "18500 sqm" → 18500
-    area_sqm_match = re.search(r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(?:sq\.?\s*m|sqm|square\s*(?:meter|metre|m))', cleaned, re.IGNORECASE)
+    area_sqm_match = _AREA_SQM_RE.search(cleaned)
     if area_sqm_match:
         try:
             num_str = area_sqm_match.group(1).replace(',', '')
@@ -96,7 +120,7 @@ def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
             pass
     
     # Square feet: "18,500 sq. ft" or "18500 sqft" → convert to sqm (multiply by 0.092903)
-    area_sqft_match = re.search(r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(?:sq\.?\s*ft|sqft|square\s*(?:feet|ft))', cleaned, re.IGNORECASE)
+    area_sqft_match = _AREA_SQFT_RE.search(cleaned)
     if area_sqft_match:
         try:
             num_str = area_sqft_match.group(1).replace(',', '')
@@ -107,7 +131,7 @@ def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
             pass
     
     # Acres: "5 acres" or "5 ac" → convert to sqm (multiply by 4046.86)
-    acres_match = re.search(r'(\d+\.?\d*)\s*(?:acre|acres|ac\.?)', cleaned, re.IGNORECASE)
+    acres_match = _ACRES_RE.search(cleaned)
     if acres_match:
         try:
             num_str = acres_match.group(1).replace(',', '')
@@ -118,7 +142,7 @@ def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
             pass
     
     # Hectares: "2 hectares" or "2 ha" → convert to sqm (multiply by 10000)
-    hectares_match = re.search(r'(\d+\.?\d*)\s*(?:hectare|hectares|ha\.?)', cleaned, re.IGNORECASE)
+    hectares_match = _HECTARES_RE.search(cleaned)
     if hectares_match:
         try:
             num_str = hectares_match.group(1).replace(',', '')
@@ -130,15 +154,10 @@ def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
     
     # Pattern 7: Extract first number (with decimals, commas)
     # Remove common words: students, FTE, sqm, sq ft, etc.
-    cleaned_for_number = re.sub(
-        r'\b(students|student|FTE|fte|sq\.?\s*ft|square\s*(?:feet|ft)|area|count|number|total|per|each)\b',
-        '',
-        cleaned,
-        flags=re.IGNORECASE
-    )
+    cleaned_for_number = _NOISE_WORDS_RE.sub('', cleaned)
     
     # Find first number (with optional decimals and commas)
-    number_match = re.search(r'(\d+(?:,\d{3})*(?:\.\d+)?)', cleaned_for_number)
+    number_match = _FIRST_NUMBER_RE.search(cleaned_for_number)
     if number_match:
         try:
             num_str = number_match.group(1).replace(',', '')
@@ -147,7 +166,7 @@ def parse_numeric(value: Union[str, int, float, None]) -> Optional[float]:
             pass
     
     # Pattern 8: Simple number extraction (last resort)
-    numbers = re.findall(r'\d+\.?\d*', cleaned)
+    numbers = _ANY_NUMBER_RE.findall(cleaned)
     if numbers:
         try:
             return float(numbers[0])
@@ -0,0 +1,42 @@
+"""
+Worker process pool shared by the CPU-bound parsing helpers
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Process-wide pool, started on first use and kept warm: workers keep their imports (and
+    Docling converters) between calls, so only the first call pays the ~0.7 s start-up.
+    Workers come from a forkserver (spawn where unavailable), never a fork of the server
+    process, which is running uvicorn, executor and event-loop threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context(start_method)
+            )
+        return _pool
+
+
+def discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a pool that broke (e.g. a worker was killed), so the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)